@@ -0,0 +1,204 @@
+"""
+Headless batch audit for contract portfolios.
+
+Runs DocumentParser -> LegalNLPEngine -> LegalRiskEngine over every PDF/DOCX in
+a directory (or listed in a manifest file, one path per line) on a worker pool
+and appends one JSON line per contract to the output file. Re-running with the
+same output file skips contracts that are already done, so an interrupted run
+can simply be restarted. Audits that got no AI answer (quota, outage) are
+recorded as errors and partially covered ones as "partial", never as "ok", so
+--retry-errors picks both up again.
+
+Examples:
+    python batch_audit.py contracts/ --out results.jsonl --workers 8
+    python batch_audit.py manifest.txt --out results.jsonl --executor process
+    python batch_audit.py contracts/ --executor async    # many audits in flight, rate-limited
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+from core import document_parser, ocr
+from core.artifacts import ArtifactStore
+from core.nlp_engine import LegalNLPEngine
+from core.risk_engine import LegalRiskEngine
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.docx', '.doc')
+STAGES = ("parse", "nlp", "audit", "total")
+
+
+def collect_inputs(source: str):
+    if os.path.isdir(source):
+        paths = []
+        for root, _, files in os.walk(source):
+            paths.extend(os.path.join(root, f) for f in files if f.lower().endswith(SUPPORTED_EXTENSIONS))
+        return sorted(paths)
+
+    # Manifest: one path per line, relative paths are relative to the manifest
+    base = os.path.dirname(os.path.abspath(source))
+    with open(source, encoding="utf-8") as f:
+        lines = [line.strip() for line in f if line.strip() and not line.startswith("#")]
+    return [p if os.path.isabs(p) else os.path.join(base, p) for p in lines]
+
+
+def load_done(out_path: str, retry_errors: bool):
+    done = set()
+    if not os.path.exists(out_path):
+        return done
+    with open(out_path, encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial line from an interrupted run
+            if record.get("status") == "ok" or not retry_errors:
+                done.add(record["path"])
+    return done
+
+
+def _init_process_worker():
+    # The pool already uses every core; don't fan out again per PDF (text or OCR).
+    document_parser.PDF_WORKERS = 1
+    ocr.OCR_WORKERS = 1
+
+
+def _prepare(path: str, record: dict, timings: dict) -> str:
+    """Parse + NLP stages (served from the artifact cache on re-runs); returns the contract text."""
+    t0 = time.perf_counter()
+    with open(path, "rb") as f:
+        artifacts, error = ArtifactStore().load(f)
+    timings["parse"] = time.perf_counter() - t0
+    if error:
+        raise ValueError(error)
+
+    t0 = time.perf_counter()
+    record["language"] = LegalNLPEngine.detect_language(artifacts.text)
+    record["clause_count"] = len(artifacts.clauses)
+    # The spaCy model is only loaded if the annotations aren't cached yet
+    record["metadata"] = artifacts.metadata()
+    timings["nlp"] = time.perf_counter() - t0
+    return artifacts.text
+
+
+def _finish(record: dict, timings: dict, start: float) -> dict:
+    timings["total"] = time.perf_counter() - start
+    record["timings"] = {k: round(v, 3) for k, v in timings.items()}
+    return record
+
+
+def _set_analysis(record: dict, analysis: dict):
+    record["analysis"] = analysis
+    if analysis.get("windows_failed"):
+        record["status"] = "partial"
+
+
+def audit_one(path: str) -> dict:
+    """Full pipeline for one contract. Never raises: errors become records."""
+    timings = {}
+    record = {"path": path, "status": "ok"}
+    start = time.perf_counter()
+    try:
+        text = _prepare(path, record, timings)
+        t0 = time.perf_counter()
+        # strict: a provider failure raises instead of returning the offline pre-screen
+        _set_analysis(record, LegalRiskEngine(strict=True).analyze_contract(text))
+        timings["audit"] = time.perf_counter() - t0
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    return _finish(record, timings, start)
+
+
+async def audit_one_async(path: str, cpu_slots: asyncio.Semaphore) -> dict:
+    """audit_one for the async executor: parse/NLP on a thread, audit on the event loop."""
+    timings = {}
+    record = {"path": path, "status": "ok"}
+    start = time.perf_counter()
+    try:
+        async with cpu_slots:
+            text = await asyncio.to_thread(_prepare, path, record, timings)
+        t0 = time.perf_counter()
+        _set_analysis(record, await LegalRiskEngine(strict=True).analyze_contract_async(text))
+        timings["audit"] = time.perf_counter() - t0
+    except Exception as e:
+        record["status"] = "error"
+        record["error"] = str(e)
+    return _finish(record, timings, start)
+
+
+async def run_async(pending, workers: int, on_record):
+    # Parsing is CPU-bound and capped at `workers`; LLM calls are only bounded
+    # by AUDIT_CONCURRENCY and the provider rate limiters.
+    cpu_slots = asyncio.Semaphore(workers)
+    for next_done in asyncio.as_completed([audit_one_async(p, cpu_slots) for p in pending]):
+        on_record(await next_done)
+
+
+def print_report(records, elapsed: float):
+    ok = [r for r in records if r["status"] == "ok"]
+    partial = [r for r in records if r["status"] == "partial"]
+    print("\n📊 Batch Summary")
+    print(f"   Contracts: {len(records)}  (✅ {len(ok)} ok, ⚠️ {len(partial)} partial, "
+          f"❌ {len(records) - len(ok) - len(partial)} failed)")
+    if elapsed > 0:
+        print(f"   Throughput: {len(ok) / elapsed * 60:.1f} fully audited contracts/min  ({elapsed:.1f}s wall clock)")
+    for stage in STAGES:
+        values = sorted(r["timings"][stage] for r in records if stage in r["timings"])
+        if not values:
+            continue
+        p95 = values[min(len(values) - 1, int(0.95 * (len(values) - 1) + 0.5))]
+        print(f"   {stage:<6} mean {statistics.mean(values):7.2f}s   p50 {statistics.median(values):7.2f}s   p95 {p95:7.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source", help="Directory of contracts or manifest file")
+    parser.add_argument("--out", default="audit_results.jsonl", help="JSON Lines output (appended to)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 4)
+    parser.add_argument("--executor", choices=["thread", "process", "async"], default="thread",
+                        help="thread: best when LLM latency dominates; process: best for heavy parsing/NLP; "
+                             "async: dozens of audits in flight under provider rate limits")
+    parser.add_argument("--retry-errors", action="store_true", help="Re-run contracts that failed or were only partially audited")
+    parser.add_argument("--limit", type=int, default=None, help="Only process the first N pending contracts")
+    args = parser.parse_args()
+
+    paths = collect_inputs(args.source)
+    done = load_done(args.out, args.retry_errors)
+    pending = [p for p in paths if p not in done][:args.limit]
+    print(f"🔍 {len(paths)} contracts found, {len(paths) - len(pending)} already done, {len(pending)} to audit.")
+    if not pending:
+        return
+
+    records = []
+    start = time.perf_counter()
+    with open(args.out, "a", encoding="utf-8") as out:
+        def on_record(record):
+            # One flushed line per contract: a crash loses at most the in-flight ones
+            out.write(json.dumps(record, ensure_ascii=False) + "\n")
+            out.flush()
+            records.append(record)
+            icon = {"ok": "✅", "partial": "⚠️"}.get(record["status"], "❌")
+            print(f"{icon} [{len(records)}/{len(pending)}] {record['path']} ({record['timings']['total']:.1f}s)")
+
+        if args.executor == "async":
+            asyncio.run(run_async(pending, args.workers, on_record))
+        else:
+            if args.executor == "process":
+                pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=document_parser.POOL_CONTEXT,
+                                           initializer=_init_process_worker)
+            else:
+                pool = ThreadPoolExecutor(max_workers=args.workers)
+            with pool:
+                futures = [pool.submit(audit_one, p) for p in pending]
+                for future in as_completed(futures):
+                    on_record(future.result())
+
+    print_report(records, time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Tail-latency benchmark for LLMRouter hedging, using local stub providers.
+
+The primary model is usually fast but sometimes stalls (throttling); the
+backups are consistently a bit slower. Compares the serial walk against
+hedged routing.
+
+Run from the repo root:
+    python -m benchmarks.bench_hedging --requests 200
+"""
+import argparse
+import random
+import statistics
+import time
+
+from core.llm_router import LLMRouter
+
+MODELS = ["primary", "backup-1", "backup-2"]
+
+
+def make_stub(slow_rate: float, slow_seconds: float, seed: int):
+    rng = random.Random(seed)
+
+    def call(model_name: str, prompt: str) -> str:
+        if model_name == "primary":
+            delay = slow_seconds if rng.random() < slow_rate else 0.05
+        else:
+            delay = 0.15
+        time.sleep(delay)
+        return f"{model_name}: ok"
+    return call
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def run(router: LLMRouter, n: int):
+    latencies = []
+    for _ in range(n):
+        start = time.perf_counter()
+        router.generate("ping")
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--slow-rate", type=float, default=0.1, help="Fraction of primary calls that stall")
+    parser.add_argument("--slow-seconds", type=float, default=2.0)
+    parser.add_argument("--hedge-delay", type=float, default=0.2)
+    args = parser.parse_args()
+
+    configs = [
+        ("serial", 0.0),
+        (f"hedged @{args.hedge_delay}s", args.hedge_delay),
+    ]
+    print(f"⏱️  {args.requests} requests, primary stalls {args.slow_rate:.0%} of the time for {args.slow_seconds}s\n")
+    for label, delay in configs:
+        router = LLMRouter(models=MODELS, call_fn=make_stub(args.slow_rate, args.slow_seconds, seed=42),
+                           available_fn=lambda m: True, hedge_delay=delay)
+        lat = run(router, args.requests)
+        print(f"✅ {label:<16} p50 {statistics.median(lat) * 1000:7.1f} ms   "
+              f"p95 {percentile(lat, 95) * 1000:7.1f} ms   p99 {percentile(lat, 99) * 1000:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
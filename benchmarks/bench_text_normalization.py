@@ -0,0 +1,86 @@
+"""
+Text-normalization micro-benchmark: the old per-step regexes vs. the calls the
+app makes today.
+
+Old pipeline: two re.sub cleaning passes (DocumentParser), two uncompiled
+redaction regexes (anonymize_text) and a findall over every Devanagari
+character (detect_language).
+New pipeline: normalize_layout (DocumentParser cleaning), redact_pii
+(anonymize_text) and LegalNLPEngine.detect_language (early-exit count).
+
+Run from the repo root:
+    python -m benchmarks.bench_text_normalization --mb 8
+"""
+import argparse
+import re
+import time
+
+from core.nlp_engine import LegalNLPEngine
+from core.text_normalizer import count_script, normalize_layout, redact_pii
+
+CLAUSES = [
+    "The Service Provider shall indemnify and hold harmless the Client against all claims.\n\n",
+    "Notices shall be sent to legal@acme-india.com or +91 9876543210 within   7 days.\n",
+    "Vendor PAN ABCDE1234F, GSTIN 27ABCDE1234F1Z5; signatory Aadhaar 2345 6789 0123.\n",
+    "This Agreement shall be governed by the laws of India and the courts at New Delhi.\n",
+    "सेवा प्रदाता किसी भी नुकसान के लिए ग्राहक को क्षतिपूर्ति करेगा।\n",
+]
+
+
+def build_corpus(megabytes: float) -> str:
+    block = "".join(CLAUSES)
+    return block * int(megabytes * 1e6 / len(block.encode("utf-8")) + 1)
+
+
+def old_pipeline(text: str):
+    text = re.sub(r'\n+', '\n', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', "[REDACTED_EMAIL]", text)
+    text = re.sub(r'\b\d{10}\b', "[REDACTED_PHONE]", text)
+    hindi = len(re.findall(r'[ऀ-ॿ]', text))
+    return text, "Hindi" if hindi > 50 else "English"
+
+
+def new_pipeline(text: str):
+    text = redact_pii(normalize_layout(text))
+    return text, LegalNLPEngine.detect_language(text)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    out = fn(*args)
+    return time.perf_counter() - start, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mb", type=float, default=8.0, help="Corpus size in megabytes")
+    args = parser.parse_args()
+
+    text = build_corpus(args.mb)
+    print(f"📄 Synthetic EN/HI corpus: {len(text.encode('utf-8')) / 1e6:.1f} MB, {len(text):,} chars\n")
+
+    print("Per stage:")
+    stages = [
+        ("cleaning (2x re.sub)", lambda: re.sub(r'\s+', ' ', re.sub(r'\n+', '\n', text))),
+        ("cleaning (compiled)", lambda: normalize_layout(text)),
+        ("redaction (2 kinds)", lambda: re.sub(r'\b\d{10}\b', "", re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', "", text))),
+        ("redaction (5 kinds)", lambda: redact_pii(text)),
+        ("language (findall)", lambda: len(re.findall(r'[ऀ-ॿ]', text))),
+        ("language (early exit)", lambda: count_script(text, limit=50)),
+    ]
+    for label, fn in stages:
+        elapsed, _ = timed(fn)
+        print(f"   {label:<24} {elapsed * 1000:9.1f} ms")
+
+    print("\nEnd to end:")
+    old_time, (old_text, old_lang) = timed(old_pipeline, text)
+    new_time, (new_text, new_lang) = timed(new_pipeline, text)
+    print(f"✅ old pipeline              {old_time * 1000:9.1f} ms  ({old_lang})")
+    print(f"✅ app pipeline              {new_time * 1000:9.1f} ms  ({new_lang})  x{old_time / new_time:.2f}")
+    print(f"   PAN/Aadhaar/GSTIN left unredacted by the old pipeline: "
+          f"{old_text.count('ABCDE1234F')} / {new_text.count('ABCDE1234F')} (old / new)")
+
+
+if __name__ == "__main__":
+    main()
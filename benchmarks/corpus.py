@@ -0,0 +1,83 @@
+"""
+Synthetic English/Hindi contracts for the benchmarks, as text, PDF and DOCX.
+
+Deterministic for a given seed, so runs are comparable across machines and commits.
+"""
+import io
+import random
+from typing import Optional
+
+import docx
+from fpdf import FPDF
+
+CLAUSES_EN = [
+    "The Service Provider shall indemnify and hold harmless the Client against any and all losses, claims and damages arising out of this Agreement.",
+    "The Client may terminate this Agreement at any time, for any reason, without prior notice to the Service Provider.",
+    "All notices under this Agreement shall be in writing and delivered by courier or email to the addresses set out above.",
+    "Acme Technologies Pvt Ltd shall pay Rs. 2,50,000 to Beta Solutions LLP within 30 days of each invoice dated 1 April 2025.",
+    "Any dispute shall be referred to arbitration seated in Singapore under the rules of the Singapore International Arbitration Centre.",
+    "The Employee shall not, for a period of two years after termination, directly or indirectly compete with the Company in India.",
+    "This Agreement may be executed in counterparts, each of which shall be deemed an original and all of which together form one instrument.",
+    "The Vendor assigns to the Client all right, title and interest in any intellectual property created under this Agreement.",
+    "Late payments shall attract a penalty of two percent per month, and the Client may set off any amounts owed by the Vendor.",
+    "This Agreement shall automatically renew for successive one-year terms unless either party gives ninety days' written notice.",
+    "Confidential Information shall be protected by both parties during the term and for five years after its expiry.",
+    "The courts at New Delhi shall have exclusive jurisdiction over all matters arising out of this Agreement.",
+]
+
+CLAUSES_HI = [
+    "सेवा प्रदाता किसी भी और सभी नुकसान के लिए ग्राहक को क्षतिपूर्ति करेगा और यह दायित्व असीमित होगा।",
+    "ग्राहक बिना किसी पूर्व सूचना के किसी भी समय इस अनुबंध को एकतरफा समाप्त कर सकता है।",
+    "इस अनुबंध के तहत सभी सूचनाएं लिखित रूप में ऊपर दिए गए पते पर भेजी जाएंगी।",
+    "एक्मे टेक्नोलॉजीज प्राइवेट लिमिटेड प्रत्येक चालान के 30 दिनों के भीतर ₹2,50,000 का भुगतान करेगी।",
+    "विलंबित भुगतान पर प्रति माह दो प्रतिशत का जुर्माना लगेगा।",
+    "दोनों पक्ष अनुबंध की अवधि के दौरान और उसके पांच वर्ष बाद तक गोपनीय जानकारी की रक्षा करेंगे।",
+    "इस अनुबंध से उत्पन्न सभी मामलों पर नई दिल्ली की अदालतों का अनन्य क्षेत्राधिकार होगा।",
+]
+
+
+class NamedBytes(io.BytesIO):
+    """In-memory stand-in for a Streamlit upload (parse_file needs `.name`)."""
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
+
+def build_contract_text(n_clauses: int, language: str = "en", seed: int = 42) -> str:
+    """Numbered clauses; language is "en", "hi" or "mixed" (every third clause in Hindi)."""
+    rng = random.Random(seed)
+    lines = []
+    for i in range(1, n_clauses + 1):
+        hindi = language == "hi" or (language == "mixed" and i % 3 == 0)
+        lines.append(f"{i}. {rng.choice(CLAUSES_HI if hindi else CLAUSES_EN)}")
+    return "\n".join(lines)
+
+
+def build_pdf(text: str, hindi_font: Optional[str] = None) -> bytes:
+    """
+    PDF with one paragraph per clause. The FPDF core fonts are Latin-1 only, so
+    Devanagari needs a Unicode TTF (`hindi_font`); without one it is dropped.
+    """
+    pdf = FPDF()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.add_page()
+    if hindi_font:
+        pdf.add_font("Hindi", "", hindi_font, uni=True)
+        pdf.set_font("Hindi", size=10)
+    else:
+        pdf.set_font("Arial", size=10)
+        text = text.replace("₹", "Rs. ").encode("latin-1", "ignore").decode("latin-1")
+    for line in text.split("\n"):
+        pdf.multi_cell(0, 5, line)
+    out = pdf.output(dest='S')
+    return out.encode('latin-1') if isinstance(out, str) else bytes(out)
+
+
+def build_docx(text: str) -> bytes:
+    document = docx.Document()
+    for line in text.split("\n"):
+        document.add_paragraph(line)
+    buf = io.BytesIO()
+    document.save(buf)
+    return buf.getvalue()
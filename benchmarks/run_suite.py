@@ -0,0 +1,192 @@
+"""
+Offline end-to-end benchmark suite: the regression gate before upgrading production.
+
+Generates synthetic English/Hindi contracts (PDF + DOCX) and times every stage
+of the pipeline without network access or API keys. Downstream stages run on
+the text as parse_file returns it, not on the generator's raw text:
+    parse (PDF, DOCX) -> segment_clauses -> extract_metadata
+    -> analyze_contract (single prompt and chunked, against a stub provider)
+    -> report / contract PDF builders
+For each stage it reports latency percentiles, throughput and peak Python
+memory (tracemalloc), and can compare against a saved baseline.
+
+Run from the repo root:
+    python -m benchmarks.run_suite --save-baseline bench_baseline.json
+    python -m benchmarks.run_suite --baseline bench_baseline.json     # exits 1 on regression
+    python -m benchmarks.run_suite --clauses 2000 --latency 0.5 --failure-rate 0.1
+"""
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.corpus import NamedBytes, build_contract_text, build_docx, build_pdf
+from benchmarks.stub_provider import StubProvider
+from core.document_parser import DocumentParser
+from core.nlp_engine import LegalNLPEngine
+from core.risk_engine import MAX_PROMPT_CHARS, LegalRiskEngine
+from utils.helpers import generate_contract_pdf, generate_pdf_report
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def measure(fn, repeat: int):
+    """Latencies over `repeat` runs (after one warm-up), then one traced run for peak memory."""
+    fn()
+    latencies = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return latencies, peak
+
+
+def check_segmentation(documents, expected: int):
+    """
+    Parsed uploads must still segment into their clauses; if the parser flattens
+    clause boundaries, pre-screening and incremental re-audits silently stop working.
+    """
+    for label, text in documents:
+        found = len(LegalNLPEngine.segment_clauses(text))
+        print(f"🧩 Segmentation after parse_file ({label}): {found} of {expected} clauses")
+        if found < expected * 0.9:
+            sys.exit(f"❌ parse_file lost the clause boundaries of the {label} corpus")
+
+
+def build_stages(args):
+    raw_text = build_contract_text(args.clauses, args.language, seed=args.seed)
+    pdf_bytes = build_pdf(raw_text, args.hindi_font)
+    docx_bytes = build_docx(raw_text)
+
+    text, error = DocumentParser.parse_file(NamedBytes(docx_bytes, "bench.docx"))
+    if error:
+        sys.exit(error)
+    documents = [("DOCX", text)]
+    # Without a Unicode font the PDF drops the Hindi clauses, so only an English PDF is comparable
+    if args.language == "en" or args.hindi_font:
+        documents.append(("PDF", DocumentParser.parse_file(NamedBytes(pdf_bytes, "bench.pdf"))[0] or ""))
+    check_segmentation(documents, args.clauses)
+
+    long_text = text
+    while len(long_text) <= MAX_PROMPT_CHARS * 3:
+        long_text += "\n" + long_text
+
+    stub = StubProvider(latency=args.latency, jitter=args.latency / 4, failure_rate=args.failure_rate, seed=args.seed)
+    engine = LegalRiskEngine(use_cache=False)
+    engine.providers = stub
+    analysis = engine.analyze_contract(text)
+    draft = "\n\n".join(text.split("\n"))
+
+    print(f"📄 Corpus: {args.clauses} clauses ({args.language}), {len(text):,} chars | "
+          f"PDF {len(pdf_bytes) / 1e3:.0f} KB | DOCX {len(docx_bytes) / 1e3:.0f} KB | "
+          f"long contract {len(long_text):,} chars")
+    if args.language != "en" and not args.hindi_font:
+        print("   ℹ️  No --hindi-font given: Devanagari is dropped from the PDF (DOCX keeps it).")
+    print(f"🤖 Stub provider: {args.latency * 1000:.0f} ms ± {args.latency / 4 * 1000:.0f} ms, "
+          f"{args.failure_rate:.0%} failures\n")
+
+    # (name, fn, units per run, unit label)
+    stages = [
+        ("parse.pdf", lambda: DocumentParser.parse_file(NamedBytes(pdf_bytes, "bench.pdf")), len(pdf_bytes) / 1e3, "KB"),
+        ("parse.docx", lambda: DocumentParser.parse_file(NamedBytes(docx_bytes, "bench.docx")), len(docx_bytes) / 1e3, "KB"),
+        ("nlp.segment", lambda: LegalNLPEngine.segment_clauses(text), args.clauses, "clauses"),
+        ("nlp.metadata", lambda: LegalNLPEngine().extract_metadata(text), len(text) / 1e3, "Kchars"),
+        ("audit.single", lambda: engine.analyze_contract(text[:MAX_PROMPT_CHARS], chunked=False), 1, "audits"),
+        ("audit.chunked", lambda: engine.analyze_contract(long_text, chunked=True), 1, "audits"),
+        ("pdf.report", lambda: generate_pdf_report(analysis, is_draft=True), 1, "reports"),
+        ("pdf.contract", lambda: generate_contract_pdf(draft), 1, "contracts"),
+    ]
+    return stages, stub
+
+
+def run_suite(args):
+    stages, stub = build_stages(args)
+    results = {}
+    print(f"{'stage':<14} {'p50 ms':>10} {'p95 ms':>10} {'throughput':>22} {'peak KB':>10}")
+    for name, fn, units, unit in stages:
+        if args.only and name not in args.only:
+            continue
+        try:
+            latencies, peak = measure(fn, args.repeat)
+        except Exception as e:
+            print(f"⏭️  {name:<12} skipped ({e})")
+            continue
+        p50 = statistics.median(latencies)
+        row = {
+            "p50_ms": round(p50 * 1000, 2),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+            "throughput": round(units / p50, 2) if p50 else 0.0,
+            "unit": f"{unit}/s",
+            "peak_kb": round(peak / 1024),
+        }
+        results[name] = row
+        print(f"✅ {name:<12} {row['p50_ms']:>10.1f} {row['p95_ms']:>10.1f} "
+              f"{row['throughput']:>14.1f} {row['unit']:<7} {row['peak_kb']:>10,}")
+
+    print(f"\n🤖 Stub calls: {stub.calls} ({stub.failures} injected failures)")
+    return results
+
+
+def compare(results, baseline, tolerance: float) -> bool:
+    """Prints the comparison; returns True if any stage regressed beyond tolerance."""
+    regressed = False
+    print(f"\n📊 Against baseline (tolerance {tolerance:.0%}):")
+    for name, row in results.items():
+        base = baseline.get(name)
+        if not base:
+            print(f"   {name:<14} (new stage)")
+            continue
+        notes = []
+        for metric in ("p50_ms", "peak_kb"):
+            if base[metric] and row[metric] > base[metric] * (1 + tolerance):
+                notes.append(f"{metric} {base[metric]} -> {row[metric]}")
+        speedup = base["p50_ms"] / row["p50_ms"] if row["p50_ms"] else float("inf")
+        if notes:
+            regressed = True
+            print(f"❌ {name:<14} x{speedup:.2f}  REGRESSION: {', '.join(notes)}")
+        else:
+            print(f"✅ {name:<14} x{speedup:.2f}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clauses", type=int, default=400, help="Clauses in the synthetic contract")
+    parser.add_argument("--language", choices=["en", "hi", "mixed"], default="mixed")
+    parser.add_argument("--hindi-font", default=None, help="Unicode TTF with Devanagari, for Hindi PDFs")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--latency", type=float, default=0.2, help="Stub provider latency (seconds)")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Fraction of stub calls that fail")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Run only these stages")
+    parser.add_argument("--baseline", help="JSON from a previous --save-baseline run to compare against")
+    parser.add_argument("--save-baseline", help="Write this run's results as a baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown before failing")
+    args = parser.parse_args()
+
+    results = run_suite(args)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"💾 Baseline written to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if compare(results, baseline, args.tolerance):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
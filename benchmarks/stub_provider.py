@@ -0,0 +1,85 @@
+"""
+Local stand-in for core.providers.ProviderPool: no network, no API keys.
+
+Latency (with jitter) and failure rate are configurable, answers are valid
+audit JSON quoting clauses from the prompt, so LegalRiskEngine exercises its
+real prompt building, parsing, validation, merge and fallback paths.
+"""
+import asyncio
+import json
+import random
+import re
+import threading
+import time
+from typing import Iterator
+
+CONTRACT_MARKER = "CONTRACT TEXT:"
+SENTENCE = re.compile(r'[^.!?।]{40,}[.!?।]')
+
+
+class StubProviderError(RuntimeError):
+    pass
+
+
+class StubProvider:
+    def __init__(self, latency: float = 0.2, jitter: float = 0.05, failure_rate: float = 0.0, seed: int = 42):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.failures = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def is_available(self, model_name: str) -> bool:
+        return True
+
+    def _draw(self):
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self._rng.gauss(self.latency, self.jitter)) if self.latency else 0.0
+            failed = self._rng.random() < self.failure_rate
+            if failed:
+                self.failures += 1
+        return delay, failed
+
+    @staticmethod
+    def answer(prompt: str) -> str:
+        contract = prompt.split(CONTRACT_MARKER, 1)[-1]
+        quotes = [m.group(0).strip() for m in SENTENCE.finditer(contract)][:3] or [contract.strip()[:200]]
+        return json.dumps({
+            "overall_score": 80,
+            "risk_level": "High",
+            "detected_language": "English",
+            "summary_english": "Stub audit: heavily weighted towards the Client.",
+            "summary_hindi": "स्टब ऑडिट: अनुबंध ग्राहक के पक्ष में है।",
+            "clauses": [
+                {
+                    "original_text": quote,
+                    "risk_score": 90 - 10 * i,
+                    "explanation_english": "Stub finding.",
+                    "explanation_hindi": "स्टब निष्कर्ष।",
+                    "recommendation": "Negotiate."
+                }
+                for i, quote in enumerate(quotes)
+            ]
+        }, ensure_ascii=False)
+
+    def generate(self, model_name: str, prompt: str) -> str:
+        delay, failed = self._draw()
+        time.sleep(delay)
+        if failed:
+            raise StubProviderError("429 stub quota exceeded")
+        return self.answer(prompt)
+
+    async def generate_async(self, model_name: str, prompt: str) -> str:
+        delay, failed = self._draw()
+        await asyncio.sleep(delay)
+        if failed:
+            raise StubProviderError("429 stub quota exceeded")
+        return self.answer(prompt)
+
+    def stream(self, model_name: str, prompt: str, chunk_chars: int = 64) -> Iterator[str]:
+        text = self.generate(model_name, prompt)
+        for i in range(0, len(text), chunk_chars):
+            yield text[i:i + chunk_chars]
@@ -0,0 +1,102 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from spacy.tokens import DocBin
+from spacy.vocab import Vocab
+
+from core.cache import DiskCache, make_key
+from core.document_parser import DocumentParser
+from core.nlp_engine import LegalNLPEngine
+from core.tracing import span
+
+# Bump whenever parsing, cleaning or segmentation changes so stale artifacts are not served.
+ARTIFACT_VERSION = "v4"
+# What extract_metadata reads back from the cached annotations
+DOCBIN_ATTRS = ["ENT_IOB", "ENT_TYPE", "SENT_START"]
+
+_artifact_cache = None
+
+def get_artifact_cache() -> DiskCache:
+    global _artifact_cache
+    if _artifact_cache is None:
+        _artifact_cache = DiskCache(
+            "artifacts",
+            max_entries=int(os.getenv("ARTIFACT_CACHE_MAX_ENTRIES", "400")),
+            ttl_seconds=float(os.getenv("ARTIFACT_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+        )
+    return _artifact_cache
+
+
+def read_upload(uploaded_file) -> bytes:
+    """Raw bytes of a Streamlit upload or an open binary file, leaving it rewound."""
+    if hasattr(uploaded_file, "getvalue"):
+        return uploaded_file.getvalue()
+    uploaded_file.seek(0)
+    data = uploaded_file.read()
+    uploaded_file.seek(0)
+    return data
+
+
+def upload_key(data: bytes, filename: str) -> str:
+    # The extension picks the parser, so the same bytes as .pdf and .docx are different artifacts
+    return make_key(data, os.path.splitext(filename)[1].lower(), ARTIFACT_VERSION)
+
+
+class DocumentArtifacts:
+    """
+    Everything derived from one uploaded file: extracted text, segmented
+    clauses and (on first use) the spaCy annotations, all stored under the
+    hash of the upload bytes.
+    """
+    def __init__(self, cache: DiskCache, key: str, text: str, clauses: List[str]):
+        self.cache = cache
+        self.key = key
+        self.text = text
+        self.clauses = clauses
+
+    def docs(self, engine: Optional[LegalNLPEngine] = None) -> List[Any]:
+        """spaCy Docs for the text; deserialized from the cached DocBin when available."""
+        blob = self.cache.get(self.key + ":docbin")
+        if blob is not None:
+            with span("artifacts.docbin_load"):
+                # DocBin carries its own strings, so the model itself is not loaded
+                return list(DocBin().from_bytes(blob).get_docs(Vocab()))
+
+        docs = (engine or LegalNLPEngine()).annotate(self.text)
+        doc_bin = DocBin(attrs=DOCBIN_ATTRS, docs=docs)
+        self.cache.set(self.key + ":docbin", doc_bin.to_bytes())
+        return docs
+
+    def metadata(self, engine: Optional[LegalNLPEngine] = None) -> Dict[str, Any]:
+        return LegalNLPEngine.metadata_from_docs(self.docs(engine))
+
+
+class ArtifactStore:
+    """
+    Parse-and-NLP cache keyed by upload bytes. Re-uploading the same exhibit
+    (or re-running a batch over the same files) skips parsing and spaCy.
+    """
+    def __init__(self, cache: Optional[DiskCache] = None):
+        self.cache = cache or get_artifact_cache()
+
+    def load(self, uploaded_file) -> Tuple[Optional[DocumentArtifacts], Optional[str]]:
+        """Like DocumentParser.parse_file, but returns (artifacts, error_message). Errors are not cached."""
+        data = read_upload(uploaded_file)
+        key = upload_key(data, uploaded_file.name)
+
+        record = self.cache.get(key)
+        if record is not None:
+            return DocumentArtifacts(self.cache, key, record["text"], record["clauses"]), None
+
+        text, error = DocumentParser.parse_file(uploaded_file)
+        if error:
+            return None, error
+        clauses = LegalNLPEngine.segment_clauses(text)
+        self.cache.set(key, {"text": text, "clauses": clauses})
+        return DocumentArtifacts(self.cache, key, text, clauses), None
+
+
+def parse_upload(uploaded_file) -> Tuple[Optional[str], Optional[str]]:
+    """Drop-in for DocumentParser.parse_file backed by the artifact cache: (text, error)."""
+    artifacts, error = ArtifactStore().load(uploaded_file)
+    return (artifacts.text, None) if artifacts else (None, error)
@@ -0,0 +1,179 @@
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import threading
+from typing import Any, Dict, Optional
+
+from core.text_normalizer import normalize_whitespace
+
+# Where persistent caches live. Override with LEGALEAGLE_CACHE_DIR in .env
+DEFAULT_CACHE_DIR = os.getenv("LEGALEAGLE_CACHE_DIR", os.path.join(".cache", "legaleagle"))
+
+
+def normalize_text(text: str) -> str:
+    """
+    Canonical form of a contract used for hashing.
+    Re-uploads of the same document usually differ only in line breaks and
+    spacing, so we collapse all whitespace runs before hashing.
+    """
+    return normalize_whitespace(text or "")
+
+
+def make_key(*parts: Any) -> str:
+    """
+    Content address: SHA-256 over all key parts (text, model name, prompt version...).
+    """
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(str(part).encode("utf-8"))
+        h.update(b"\x00")  # Separator so ("ab", "c") != ("a", "bc")
+    return h.hexdigest()
+
+
+def hash_json(value: Any) -> str:
+    """Stable content hash of a JSON-like value (e.g. an analysis result)."""
+    return make_key(json.dumps(value, sort_keys=True, ensure_ascii=False))
+
+
+class DiskCache:
+    """
+    Small persistent key/value cache on top of SQLite (stdlib, safe across
+    Streamlit sessions and worker threads).
+    - Values are JSON (dicts/lists/str) or raw bytes.
+    - Eviction: entries older than `ttl_seconds` expire, and once the
+      namespace holds more than `max_entries` the least recently used go first.
+    """
+    def __init__(self, namespace: str, cache_dir: Optional[str] = None,
+                 max_entries: int = 500, ttl_seconds: Optional[float] = 7 * 24 * 3600):
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.cache_dir = cache_dir or DEFAULT_CACHE_DIR
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self.path = os.path.join(self.cache_dir, "cache.sqlite3")
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                namespace   TEXT NOT NULL,
+                key         TEXT NOT NULL,
+                is_bytes    INTEGER NOT NULL,
+                value       BLOB NOT NULL,
+                created_at  REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, key)
+            )
+        """)
+        self._conn.commit()
+
+        # Counters for capacity tuning (per process)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    # --- READ ---
+    def get(self, key: str, default: Any = None) -> Any:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT is_bytes, value, created_at FROM entries WHERE namespace=? AND key=?",
+                (self.namespace, key)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return default
+
+            is_bytes, value, created_at = row
+            if self.ttl_seconds is not None and now - created_at > self.ttl_seconds:
+                # Expired: drop it and report a miss
+                self._conn.execute("DELETE FROM entries WHERE namespace=? AND key=?", (self.namespace, key))
+                self._conn.commit()
+                self.evictions += 1
+                self.misses += 1
+                return default
+
+            # Touch for LRU ordering
+            self._conn.execute(
+                "UPDATE entries SET accessed_at=? WHERE namespace=? AND key=?",
+                (now, self.namespace, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        return bytes(value) if is_bytes else json.loads(value)
+
+    # --- WRITE ---
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        if isinstance(value, (bytes, bytearray)):
+            is_bytes, blob = 1, bytes(value)
+        else:
+            is_bytes, blob = 0, json.dumps(value, ensure_ascii=False)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (namespace, key, is_bytes, value, created_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (self.namespace, key, is_bytes, blob, now, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE namespace=? AND key=?", (self.namespace, key))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE namespace=?", (self.namespace,))
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        # Caller holds the lock.
+        if self.ttl_seconds is not None:
+            cur = self._conn.execute(
+                "DELETE FROM entries WHERE namespace=? AND created_at < ?",
+                (self.namespace, now - self.ttl_seconds)
+            )
+            self.evictions += max(cur.rowcount, 0)
+
+        count = self._conn.execute(
+            "SELECT COUNT(*) FROM entries WHERE namespace=?", (self.namespace,)
+        ).fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            cur = self._conn.execute(
+                "DELETE FROM entries WHERE namespace=? AND key IN ("
+                "SELECT key FROM entries WHERE namespace=? ORDER BY accessed_at ASC LIMIT ?)",
+                (self.namespace, self.namespace, overflow)
+            )
+            self.evictions += max(cur.rowcount, 0)
+
+    # --- STATS ---
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM entries WHERE namespace=?", (self.namespace,)
+            ).fetchone()[0]
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "namespace": self.namespace,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+        }
@@ -0,0 +1,138 @@
+import os
+import time
+import threading
+import statistics
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# --- BREAKER SETTINGS ---
+WINDOW_SIZE = int(os.getenv("BREAKER_WINDOW", "20"))                 # Calls kept per model
+ERROR_RATE_THRESHOLD = float(os.getenv("BREAKER_ERROR_RATE", "0.5"))  # Open above this error rate...
+MIN_CALLS = int(os.getenv("BREAKER_MIN_CALLS", "4"))                 # ...once we have this many samples
+CONSECUTIVE_FAILURES = int(os.getenv("BREAKER_CONSECUTIVE_FAILURES", "3"))
+COOLDOWN_SECONDS = float(os.getenv("BREAKER_COOLDOWN", "60"))
+
+# Errors that mean "stop calling me for a while" (quota / rate limit)
+QUOTA_MARKERS = ("429", "quota", "rate limit", "resourceexhausted", "resource_exhausted")
+
+
+class CircuitBreaker:
+    """
+    Per-model breaker with rolling error-rate and latency statistics.
+    - CLOSED: calls flow normally.
+    - OPEN: calls are skipped until the cooldown expires.
+    - HALF_OPEN: a single probe call is let through; success closes the
+      breaker, failure re-opens it for another cooldown.
+    """
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, model_name: str, window: int = WINDOW_SIZE, cooldown: float = COOLDOWN_SECONDS):
+        self.model_name = model_name
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self.consecutive_failures = 0
+        self.last_error = None
+        self._outcomes = deque(maxlen=window)  # (ok, latency_seconds)
+        self._probe_in_flight = False
+        self._lock = threading.Lock()
+
+    # --- GATE ---
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.cooldown:
+                    return False
+                self.state = self.HALF_OPEN
+                self._probe_in_flight = False
+
+            if self.state == self.HALF_OPEN:
+                if self._probe_in_flight:
+                    return False
+                self._probe_in_flight = True
+            return True
+
+    # --- OUTCOMES ---
+    def record_success(self, latency: float) -> None:
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                # Recovered: forget the outage so old failures don't re-trip it
+                self._outcomes.clear()
+                self._probe_in_flight = False
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self._outcomes.append((True, latency))
+
+    def record_failure(self, latency: float, error: Optional[Exception] = None) -> None:
+        with self._lock:
+            self._outcomes.append((False, latency))
+            self.consecutive_failures += 1
+            self.last_error = str(error) if error else None
+
+            if self.state == self.HALF_OPEN or self._should_trip(error):
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self._probe_in_flight = False
+
+    def _should_trip(self, error: Optional[Exception]) -> bool:
+        # Caller holds the lock.
+        if error is not None and any(m in str(error).lower() for m in QUOTA_MARKERS):
+            return True
+        if self.consecutive_failures >= CONSECUTIVE_FAILURES:
+            return True
+        return len(self._outcomes) >= MIN_CALLS and self._error_rate() >= ERROR_RATE_THRESHOLD
+
+    # --- STATS ---
+    def _error_rate(self) -> float:
+        if not self._outcomes:
+            return 0.0
+        return sum(1 for ok, _ in self._outcomes if not ok) / len(self._outcomes)
+
+    def p50_latency(self) -> Optional[float]:
+        with self._lock:
+            latencies = [lat for ok, lat in self._outcomes if ok]
+        return statistics.median(latencies) if latencies else None
+
+    def snapshot(self) -> Dict[str, Any]:
+        p50 = self.p50_latency()
+        with self._lock:
+            retry_in = max(0.0, self.cooldown - (time.monotonic() - self.opened_at)) if self.state == self.OPEN else 0.0
+            return {
+                "model": self.model_name,
+                "state": self.state,
+                "calls": len(self._outcomes),
+                "error_rate": round(self._error_rate(), 2),
+                "p50_ms": round(p50 * 1000) if p50 is not None else None,
+                "retry_in_s": round(retry_in),
+                "last_error": (self.last_error or "")[:80]
+            }
+
+
+class HealthRegistry:
+    """
+    One CircuitBreaker per model, plus the dynamic ordering used by the router:
+    models are tried by observed p50 latency (fastest first); models with no
+    successful calls yet keep their configured priority order after them.
+    """
+    def __init__(self):
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._lock = threading.Lock()
+
+    def breaker(self, model_name: str) -> CircuitBreaker:
+        with self._lock:
+            if model_name not in self._breakers:
+                self._breakers[model_name] = CircuitBreaker(model_name)
+            return self._breakers[model_name]
+
+    def order(self, models: List[str]) -> List[str]:
+        def sort_key(model_name):
+            p50 = self.breaker(model_name).p50_latency()
+            return (p50 is None, p50 or 0.0)
+        # sorted() is stable, so ties keep the MODEL_PRIORITY order
+        return sorted(models, key=sort_key)
+
+    def snapshot(self, models: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        names = models if models is not None else list(self._breakers)
+        return [self.breaker(m).snapshot() for m in names]
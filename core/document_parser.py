@@ -1,52 +1,220 @@
 import pdfplumber
-import docx
 import io
-import re
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+from xml.etree.ElementTree import iterparse
+
+from core.ocr import ocr_languages, ocr_pages
+from core.text_normalizer import normalize_layout
+from core.tracing import span
+
+# Below this page count a process pool costs more than it saves.
+PARALLEL_MIN_PAGES = 16
+PDF_WORKERS = int(os.getenv("PDF_WORKERS", "0")) or os.cpu_count() or 1
+# Forking the multithreaded Streamlit server can deadlock the children (a lock held
+# by another thread is copied locked), so pools start workers from a clean process.
+POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+# Legacy .doc conversion (antiword / LibreOffice) is given this long before giving up
+DOC_CONVERT_TIMEOUT = int(os.getenv("DOC_CONVERT_TIMEOUT", "120"))
+
+# WordprocessingML tags, as ElementTree reports them
+W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+W_BODY, W_P, W_T, W_TBL, W_TR = (W_NS + tag for tag in ("body", "p", "t", "tbl", "tr"))
+W_SPACING = {W_NS + "tab": " ", W_NS + "br": "\n", W_NS + "cr": "\n"}
+
+# --- PROCESS-POOL WORKER STATE ---
+# Each worker receives the PDF bytes once (initializer) and opens the document
+# once, instead of re-pickling the whole file for every page range.
+_worker_pdf = None
+
+def _init_pdf_worker(pdf_bytes: bytes):
+    global _worker_pdf
+    _worker_pdf = pdfplumber.open(io.BytesIO(pdf_bytes))
+
+def _extract_page_range(start: int, stop: int) -> List[str]:
+    texts = []
+    for i in range(start, stop):
+        page = _worker_pdf.pages[i]
+        # extract_text() handles Hindi unicode better than older libraries
+        texts.append(page.extract_text() or "")
+        page.flush_cache()
+    return texts
 
 class DocumentParser:
+    @staticmethod
+    def iter_pdf_pages(source, workers: Optional[int] = None) -> Iterator[str]:
+        """
+        Yields the text of each PDF page, in page order.
+        Large PDFs are extracted in parallel (process pool over page ranges);
+        pages are yielded as soon as their range is done, so callers can start
+        clause segmentation on early pages before the last page is extracted.
+        """
+        pdf_bytes = source.getvalue() if hasattr(source, "getvalue") else source.read()
+        workers = workers or PDF_WORKERS
+
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            n_pages = len(pdf.pages)
+            if workers <= 1 or n_pages < PARALLEL_MIN_PAGES:
+                for page in pdf.pages:
+                    yield page.extract_text() or ""
+                    page.flush_cache()  # Keep memory flat on long documents
+                return
+
+        # Several small ranges per worker keeps the pool busy and the first pages early
+        step = max(1, n_pages // (workers * 4))
+        pool = ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT,
+                                   initializer=_init_pdf_worker, initargs=(pdf_bytes,))
+        try:
+            futures = [pool.submit(_extract_page_range, start, min(start + step, n_pages))
+                       for start in range(0, n_pages, step)]
+            for future in futures:
+                yield from future.result()
+        finally:
+            # Also runs if the caller stops iterating early
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def iter_docx_blocks(source) -> Iterator[str]:
+        """
+        Yields the text of each DOCX paragraph and table row, in document order.
+        Streams word/document.xml out of the zip with an incremental parser and
+        drops every block once it is yielded, so memory stays flat on large
+        files. A table row is one line (cells space-separated), kept next to the
+        clause it belongs to; nested tables are folded into their outer row.
+        """
+        with zipfile.ZipFile(source) as archive, archive.open("word/document.xml") as xml:
+            body = None
+            depth = 0        # element nesting, for spotting direct children of <w:body>
+            table_depth = 0
+            runs: List[str] = []
+            row: List[str] = []
+            for event, elem in iterparse(xml, events=("start", "end")):
+                if event == "start":
+                    depth += 1
+                    if elem.tag == W_BODY:
+                        body = elem
+                    elif elem.tag == W_TBL:
+                        table_depth += 1
+                    continue
+
+                depth -= 1
+                if elem.tag == W_T:
+                    runs.append(elem.text or "")
+                elif elem.tag in W_SPACING:
+                    runs.append(W_SPACING[elem.tag])
+                elif elem.tag == W_P:
+                    paragraph = "".join(runs)
+                    runs = []
+                    if table_depth:
+                        if paragraph.strip():
+                            row.append(paragraph)
+                    else:
+                        yield paragraph
+                elif elem.tag == W_TR and table_depth == 1:
+                    yield " ".join(row)
+                    row = []
+                    elem.clear()
+                elif elem.tag == W_TBL:
+                    table_depth -= 1
+
+                # Block done: release it (ElementTree would otherwise keep the whole tree)
+                if depth == 2 and body is not None:
+                    body.clear()
+
+    @staticmethod
+    def parse_doc(source) -> str:
+        """
+        Text of a legacy binary .doc (Word 97-2003), via antiword or, if it is
+        missing or fails on the file, a headless LibreOffice conversion to DOCX.
+        Raises RuntimeError if neither tool can read it.
+        """
+        data = source.getvalue() if hasattr(source, "getvalue") else source.read()
+        # Plenty of ".doc" uploads are really DOCX files with the wrong extension
+        if data[:2] == b"PK":
+            return "\n".join(DocumentParser.iter_docx_blocks(io.BytesIO(data)))
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "upload.doc")
+            with open(path, "wb") as f:
+                f.write(data)
+
+            if shutil.which("antiword"):
+                try:
+                    result = subprocess.run(["antiword", "-m", "UTF-8.txt", "-w", "0", path],
+                                            capture_output=True, timeout=DOC_CONVERT_TIMEOUT, check=True)
+                    return result.stdout.decode("utf-8", "replace")
+                except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+                    # antiword can't read Word 6 or encrypted files; LibreOffice may
+                    print(f"⚠️ antiword failed ({e}). Trying LibreOffice.")
+
+            soffice = shutil.which("soffice") or shutil.which("libreoffice")
+            if soffice:
+                subprocess.run([soffice, "--headless", "--convert-to", "docx", "--outdir", tmp, path],
+                               capture_output=True, timeout=DOC_CONVERT_TIMEOUT, check=True)
+                converted = os.path.join(tmp, "upload.docx")
+                # soffice exits 0 even when it could not convert the file
+                if os.path.exists(converted):
+                    return "\n".join(DocumentParser.iter_docx_blocks(converted))
+
+        raise RuntimeError("this .doc could not be read (needs antiword or LibreOffice on the server). "
+                           "Please save it as DOCX or PDF.")
+
     @staticmethod
     def parse_file(uploaded_file):
         """
-        Universal Parser: Handles PDF and DOCX with Hindi/English support.
+        Universal Parser: Handles PDF, DOCX and legacy DOC with Hindi/English support.
         Returns: (text, error_message)
         """
+        with span("parse") as sp:
+            text, error = DocumentParser._parse_file(uploaded_file)
+            sp.set(bytes=getattr(uploaded_file, "size", 0) or 0, chars=len(text or ""))
+            return text, error
+
+    @staticmethod
+    def _parse_file(uploaded_file):
         try:
             file_type = uploaded_file.name.split('.')[-1].lower()
             text = ""
 
             # --- PDF HANDLING ---
             if file_type == 'pdf':
-                with pdfplumber.open(uploaded_file) as pdf:
-                    for page in pdf.pages:
-                        # extract_text() handles Hindi unicode better than older libraries
-                        page_text = page.extract_text() or ""
-                        text += page_text + "\n"
-                
-                # Fallback: If pdfplumber got nothing (e.g., scanned image), warn the user
+                pdf_bytes = uploaded_file.getvalue() if hasattr(uploaded_file, "getvalue") else uploaded_file.read()
+                pages = list(DocumentParser.iter_pdf_pages(io.BytesIO(pdf_bytes)))
+
+                # Scanned pages (no text layer) go through local OCR, when it is installed
+                blank = [i for i, page in enumerate(pages) if not page.strip()]
+                for i, page_text in ocr_pages(pdf_bytes, blank).items():
+                    pages[i] = page_text
+                text = "\n".join(pages)
+
+                # Fallback: If we still got nothing, warn the user
                 if len(text.strip()) < 50:
+                    if ocr_languages():
+                        return None, "⚠️ No readable text found in this PDF, even with OCR. Please upload a clearer scan or a digital PDF."
                     return None, "⚠️ This PDF appears to be a scanned image. Please upload a digital PDF with selectable text."
 
             # --- DOCX HANDLING ---
-            elif file_type in ['docx', 'doc']:
-                doc = docx.Document(uploaded_file)
-                # Reads paragraphs AND tables (important for legal docs)
-                for para in doc.paragraphs:
-                    text += para.text + "\n"
-                for table in doc.tables:
-                    for row in table.rows:
-                        for cell in row.cells:
-                            text += cell.text + " "
-                        text += "\n"
+            elif file_type == 'docx':
+                # Reads paragraphs AND tables (important for legal docs), in body order
+                text = "\n".join(DocumentParser.iter_docx_blocks(uploaded_file))
+
+            # --- LEGACY DOC HANDLING ---
+            elif file_type == 'doc':
+                text = DocumentParser.parse_doc(uploaded_file)
 
             else:
-                return None, "❌ Unsupported file format. Please upload PDF or DOCX."
+                return None, "❌ Unsupported file format. Please upload PDF, DOCX or DOC."
 
             # --- CLEANING STAGE ---
-            # Remove excessive whitespace but keep Hindi characters intact
-            text = re.sub(r'\n+', '\n', text)  # Collapse multiple newlines
-            text = re.sub(r'\s+', ' ', text)   # Collapse multiple spaces
-            
-            return text.strip(), None
+            # Remove excessive whitespace but keep line breaks (clause boundaries) and Hindi characters intact
+            return normalize_layout(text), None
 
         except Exception as e:
             return None, f"❌ Error parsing document: {str(e)}"
\ No newline at end of file
@@ -0,0 +1,156 @@
+import re
+import json
+from typing import Any, Dict, List
+
+# Top-level scalar fields of the audit JSON, picked up as soon as they are complete
+NUMBER_FIELDS = ("overall_score",)
+STRING_FIELDS = ("risk_level", "detected_language", "summary_english", "summary_hindi")
+# Require a delimiter after the digits so "8" + "5" isn't read as 8
+FIELD_PATTERNS = dict(
+    [(name, re.compile(r'"%s"\s*:\s*(-?\d+(?:\.\d+)?)\s*[,}\n]' % name)) for name in NUMBER_FIELDS]
+    + [(name, re.compile(r'"%s"\s*:\s*("(?:[^"\\]|\\.)*")' % name)) for name in STRING_FIELDS]
+)
+CLAUSES_START = re.compile(r'"clauses"\s*:\s*\[')
+# Trailing commas before a closing bracket are the most common "almost JSON" slip
+TRAILING_COMMA = re.compile(r',\s*([}\]])')
+
+
+def extract_json(text: str) -> Dict[str, Any]:
+    """
+    Pulls the first complete JSON object out of a model answer, ignoring
+    markdown fences and any prose around it. One pass over the text: the
+    scanner tracks string/escape state, so braces inside values don't count.
+    Raises ValueError if no parsable object is found.
+    """
+    start, depth, in_string, escape = None, 0, False, False
+    for i, c in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif c == "\\":
+                escape = True
+            elif c == '"':
+                in_string = False
+        elif c == '"':
+            in_string = start is not None
+        elif c == "{":
+            if depth == 0:
+                start = i
+            depth += 1
+        elif c == "}" and depth > 0:
+            depth -= 1
+            if depth == 0:
+                candidate = text[start:i + 1]
+                try:
+                    return json.loads(candidate)
+                except json.JSONDecodeError:
+                    try:
+                        return json.loads(TRAILING_COMMA.sub(r"\1", candidate))
+                    except json.JSONDecodeError:
+                        start = None  # Not JSON after all (e.g. "{placeholder}" in prose); keep looking
+    raise ValueError("No JSON object found in model output")
+
+
+class IncrementalAuditParser:
+    """
+    Parses the audit JSON while it is still streaming in.
+    - overall_score / risk_level / summaries are reported once their value is complete.
+    - Each clause object is reported as soon as its closing brace arrives.
+    Scalar fields are only looked for outside the clause array (the short head
+    before it and the tail after it), and the clause scanner keeps its state
+    between feeds, so every character of the clause array is examined once no
+    matter how the stream is chunked, and chunks are never re-concatenated.
+    """
+    def __init__(self):
+        self._chunks: List[str] = []
+        self.fields: Dict[str, Any] = {}
+        self.clauses: List[Dict[str, Any]] = []
+        # Text before "clauses": [ (until it is found) and after its closing ]
+        self._head = ""
+        self._tail = ""
+        # Clause scanner state
+        self._in_clauses = False
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._obj_parts: List[str] = []
+        self._clauses_done = False
+
+    @property
+    def buffer(self) -> str:
+        """Everything fed so far."""
+        if len(self._chunks) > 1:
+            self._chunks = ["".join(self._chunks)]
+        return self._chunks[0] if self._chunks else ""
+
+    def feed(self, chunk: str) -> bool:
+        """Adds a chunk; returns True if anything new became available."""
+        self._chunks.append(chunk)
+        if self._clauses_done:
+            self._tail += chunk
+            return self._scan_fields(self._tail)
+        if self._in_clauses:
+            return self._scan_clauses(chunk)
+
+        self._head += chunk
+        changed = self._scan_fields(self._head)
+        m = CLAUSES_START.search(self._head)
+        if m:
+            self._in_clauses = True
+            changed = self._scan_clauses(self._head[m.end():]) or changed
+        return changed
+
+    def snapshot(self) -> Dict[str, Any]:
+        result = dict(self.fields)
+        result["clauses"] = list(self.clauses)
+        return result
+
+    def _scan_fields(self, text: str) -> bool:
+        changed = False
+        for name, pattern in FIELD_PATTERNS.items():
+            if name not in self.fields:
+                m = pattern.search(text)
+                if m:
+                    if name in NUMBER_FIELDS:
+                        value = float(m.group(1))
+                        self.fields[name] = int(value) if value.is_integer() else value
+                    else:
+                        self.fields[name] = json.loads(m.group(1))
+                    changed = True
+        return changed
+
+    def _scan_clauses(self, text: str) -> bool:
+        changed = False
+        obj_start = 0
+        for i, c in enumerate(text):
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif c == "\\":
+                    self._escape = True
+                elif c == '"':
+                    self._in_string = False
+            elif c == '"':
+                self._in_string = True
+            elif c == "{":
+                if self._depth == 0:
+                    obj_start = i
+                    self._obj_parts = []
+                self._depth += 1
+            elif c == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    try:
+                        self.clauses.append(json.loads("".join(self._obj_parts) + text[obj_start:i + 1]))
+                        changed = True
+                    except json.JSONDecodeError:
+                        pass  # Malformed clause: the final full parse decides
+                    self._obj_parts = []
+            elif c == "]" and self._depth == 0:
+                self._clauses_done = True
+                self._tail = text[i + 1:]
+                return self._scan_fields(self._tail) or changed
+        if self._depth > 0:
+            # Object continues in the next chunk
+            self._obj_parts.append(text[obj_start:])
+        return changed
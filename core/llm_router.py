@@ -0,0 +1,315 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Iterator, List, Optional
+
+from core.circuit_breaker import HealthRegistry
+from core.prompt_budget import count_tokens, profile, route_models
+from core.providers import get_provider_pool
+from core.tracing import span
+
+# --- 1. ULTIMATE MODEL PRIORITY LIST ---
+# STRICTLY using the models found in your list + Backups.
+MODEL_PRIORITY = [
+    "gemini-2.5-flash-lite",      # 1. Google: Fastest & High Quota
+    "gemini-2.5-flash",           # 2. Google: Best Quality
+    "gpt-4o-mini",                # 3. OpenAI: Reliable Backup
+    "llama3-70b-8192",            # 4. Groq: Super Fast Backup
+    "gemini-2.0-flash-lite",      # 5. Google: Stable Previous Gen
+    "gemini-pro-latest",          # 6. Google: Valid Legacy Model (Found in your list)
+    "gemini-flash-latest",        # 7. Google: Valid Flash Model (Found in your list)
+    "gpt-4o",                     # 8. OpenAI: Heavy Duty
+    "mixtral-8x7b-32768"          # 9. Groq: Context Backup
+]
+
+# --- 2. HEDGING SETTINGS ---
+# Latency budget (seconds) before the next model is raced in parallel. 0 = old serial walk.
+HEDGE_DELAY = float(os.getenv("LLM_HEDGE_DELAY", "4.0"))
+# Most requests allowed in flight at once for a single prompt.
+MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "3"))
+
+
+def is_available(model_name: str) -> bool:
+    """True if the provider behind `model_name` has a configured client."""
+    return get_provider_pool().is_available(model_name)
+
+
+def call_model(model_name: str, prompt: str) -> str:
+    """One blocking request to one model, on the shared client pool."""
+    return get_provider_pool().generate(model_name, prompt)
+
+
+def stream_model(model_name: str, prompt: str) -> Iterator[str]:
+    """Streaming request to one model, on the shared client pool."""
+    return get_provider_pool().stream(model_name, prompt)
+
+
+class LLMRouter:
+    """
+    Walks the model priority list, hedging slow providers:
+    the top model is called first; if it has not answered within
+    `hedge_delay` seconds (or fails), the next model is launched in parallel,
+    up to `max_in_flight` at once. The first valid answer wins and the
+    remaining attempts are abandoned (their results are discarded).
+    Every call feeds a per-model circuit breaker (see core/circuit_breaker.py):
+    models with an open breaker are skipped, and the rest are tried fastest
+    observed p50 first.
+    Models whose context window can't hold the prompt plus the answer are
+    left out, and among the rest the fast/cheap class is preferred
+    (see core/prompt_budget.py).
+    `call_fn` / `stream_fn` / `available_fn` can be swapped for local stubs in benchmarks.
+    """
+    def __init__(self, models: Optional[List[str]] = None,
+                 call_fn: Callable[[str, str], str] = call_model,
+                 available_fn: Callable[[str], bool] = is_available,
+                 hedge_delay: float = HEDGE_DELAY, max_in_flight: int = MAX_IN_FLIGHT,
+                 health: Optional[HealthRegistry] = None,
+                 stream_fn: Callable[[str, str], Iterator[str]] = stream_model):
+        self.models = list(models or MODEL_PRIORITY)
+        self.call_fn = call_fn
+        self.stream_fn = stream_fn
+        self.available_fn = available_fn
+        self.hedge_delay = hedge_delay
+        self.max_in_flight = max(1, max_in_flight)
+        self.health = health or HealthRegistry()
+
+    def candidates(self, prompt: str) -> List[str]:
+        available = [m for m in self.models if self.available_fn(m)]
+        # If nothing fits, still try the largest windows rather than give up
+        fitting = (route_models(available, count_tokens(prompt))
+                   or sorted(available, key=lambda m: profile(m).context_tokens, reverse=True))
+        return self.health.order(fitting)
+
+    def generate(self, prompt: str) -> str:
+        candidates = self.candidates(prompt)
+        if self.hedge_delay <= 0 or self.max_in_flight == 1:
+            return self._generate_serial(prompt, candidates)
+        return self._generate_hedged(prompt, candidates)
+
+    def _call(self, model_name: str, prompt: str) -> str:
+        breaker = self.health.breaker(model_name)
+        start = time.perf_counter()
+        try:
+            text = self.call_fn(model_name, prompt)
+            if not text:
+                raise ValueError("Empty response")
+        except Exception as e:
+            breaker.record_failure(time.perf_counter() - start, e)
+            raise
+        breaker.record_success(time.perf_counter() - start)
+        return text
+
+    def _next_allowed(self, queue) -> Optional[str]:
+        # Breakers are checked at launch time, so a half-open probe slot is
+        # only claimed by a call that actually goes out.
+        for model_name in queue:
+            if self.health.breaker(model_name).allow():
+                return model_name
+        return None
+
+    def _generate_serial(self, prompt: str, candidates: List[str]) -> str:
+        last_error = None
+        for model_name in candidates:
+            if not self.health.breaker(model_name).allow():
+                continue
+            try:
+                return self._call(model_name, prompt)
+            except Exception as e:
+                # Silently fail and try the next model
+                last_error = e
+        return self._busy_message(last_error)
+
+    def _generate_hedged(self, prompt: str, candidates: List[str]) -> str:
+        queue = iter(candidates)
+        pending = {}
+        last_error = None
+        pool = ThreadPoolExecutor(max_workers=self.max_in_flight)
+
+        def launch_next() -> bool:
+            model_name = self._next_allowed(queue)
+            if model_name is None:
+                return False
+            pending[pool.submit(self._call, model_name, prompt)] = model_name
+            return True
+
+        try:
+            launch_next()
+            while pending:
+                done, _ = wait(pending, timeout=self.hedge_delay, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # Latency budget blown: race the next provider alongside the slow one
+                    if len(pending) < self.max_in_flight:
+                        launch_next()
+                    continue
+
+                for future in done:
+                    pending.pop(future)
+                    try:
+                        return future.result()
+                    except Exception as e:
+                        last_error = e
+
+                # Every finished attempt failed: replace each one right away, no waiting
+                for _ in done:
+                    launch_next()
+        finally:
+            # Don't block on the losers; queued attempts are cancelled
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return self._busy_message(last_error)
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """
+        Streaming variant of generate(). Models are raced in the same health
+        order, hedged on time-to-first-token: if no first chunk arrives within
+        `hedge_delay` (or an attempt fails), the next model is started, up to
+        `max_in_flight` at once. The first model to produce a chunk wins and the
+        other streams are closed; from then on we are committed to that model
+        (answers can't be spliced), so a mid-stream failure ends the answer with
+        a notice. For streamed calls the breaker records TTFT as the latency.
+        """
+        candidates = self.candidates(prompt)
+        if self.hedge_delay <= 0 or self.max_in_flight == 1:
+            opened, last_error = self._stream_serial(prompt, candidates)
+        else:
+            opened, last_error = self._stream_hedged(prompt, candidates)
+        if opened is None:
+            yield self._busy_message(last_error)
+            return
+
+        first, chunks = opened
+        yield first
+        try:
+            for chunk in chunks:
+                if chunk:
+                    yield chunk
+        except Exception as e:
+            yield f"\n\n⚠️ Response interrupted ({e})"
+        finally:
+            self._close_stream(chunks)
+
+    def _open_stream(self, model_name: str, prompt: str):
+        """Starts a stream and waits for its first non-empty chunk: (chunk, rest of the stream)."""
+        breaker = self.health.breaker(model_name)
+        start = time.perf_counter()
+        chunks = None
+        try:
+            chunks = iter(self.stream_fn(model_name, prompt))
+            for chunk in chunks:
+                if chunk:
+                    break
+            else:
+                raise ValueError("Empty response")
+        except Exception as e:
+            breaker.record_failure(time.perf_counter() - start, e)
+            self._close_stream(chunks)
+            raise
+        breaker.record_success(time.perf_counter() - start)
+        return chunk, chunks
+
+    @staticmethod
+    def _close_stream(chunks) -> None:
+        close = getattr(chunks, "close", None)
+        if close is not None:
+            try:
+                close()
+            except Exception:
+                pass
+
+    def _stream_serial(self, prompt: str, candidates: List[str]):
+        last_error = None
+        for model_name in candidates:
+            if not self.health.breaker(model_name).allow():
+                continue
+            try:
+                return self._open_stream(model_name, prompt), None
+            except Exception as e:
+                last_error = e
+        return None, last_error
+
+    def _stream_hedged(self, prompt: str, candidates: List[str]):
+        # Same race as _generate_hedged, but an attempt finishes at its first chunk
+        queue = iter(candidates)
+        pending = {}
+        last_error = None
+        pool = ThreadPoolExecutor(max_workers=self.max_in_flight)
+
+        def launch_next() -> bool:
+            model_name = self._next_allowed(queue)
+            if model_name is None:
+                return False
+            pending[pool.submit(self._open_stream, model_name, prompt)] = model_name
+            return True
+
+        def close_loser(future) -> None:
+            if not future.cancelled() and future.exception() is None:
+                self._close_stream(future.result()[1])
+
+        winner = None
+        try:
+            launch_next()
+            while pending and winner is None:
+                done, _ = wait(pending, timeout=self.hedge_delay, return_when=FIRST_COMPLETED)
+
+                if not done:
+                    # No first token within the budget: race the next provider
+                    if len(pending) < self.max_in_flight:
+                        launch_next()
+                    continue
+
+                for future in done:
+                    pending.pop(future)
+                    try:
+                        opened = future.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    if winner is None:
+                        winner = opened
+                    else:
+                        # Two first tokens in the same tick: keep one stream
+                        self._close_stream(opened[1])
+
+                if winner is None:
+                    # Every finished attempt failed: replace each one right away
+                    for _ in done:
+                        launch_next()
+        finally:
+            # Losers still waiting for their first token are closed once it arrives
+            for future in pending:
+                future.add_done_callback(close_loser)
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        return winner, last_error
+
+    def status(self) -> List[dict]:
+        """Breaker state and rolling stats for every configured model (sidebar)."""
+        rows = self.health.snapshot(self.models)
+        for row in rows:
+            row["configured"] = self.available_fn(row["model"])
+        return rows
+
+    @staticmethod
+    def _busy_message(last_error: Optional[Exception]) -> str:
+        return f"⚠️ System Busy: All AI channels (Google, OpenAI, Groq) are overloaded. Please check your API Keys in Secrets. (Error: {str(last_error)})"
+
+
+_default_router = LLMRouter()
+
+def stream_smart_fallback(prompt) -> Iterator[str]:
+    """generate_smart_fallback, but yields the answer as it is produced."""
+    return _default_router.stream(prompt)
+
+def router_status() -> List[dict]:
+    return _default_router.status()
+
+def generate_smart_fallback(prompt):
+    """
+    Tries Google -> OpenAI -> Groq, hedging slow providers (see LLMRouter).
+    Never crashes, just moves to the next model.
+    """
+    with span("llm.fallback") as sp:
+        answer = _default_router.generate(prompt)
+        sp.set(prompt_chars=len(prompt), response_chars=len(answer or ""))
+        return answer
@@ -1,6 +1,103 @@
 import spacy
+import os
 import re
-from typing import List, Dict, Any
+import time
+import threading
+from typing import List, Dict, Any, Iterable, Optional
+
+from spacy.pipeline.tok2vec import Tok2VecListener
+
+from core.text_normalizer import count_script
+from core.tracing import span, traced
+
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+# extract_metadata only reads entities and sentences; the rest is dead weight.
+EXCLUDED_COMPONENTS = ["tagger", "parser", "attribute_ruler", "lemmatizer"]
+# The shared tok2vec only feeds components that listen to it. In the en_core_web_*
+# pipelines those are tagger and parser; ner and senter embed their own tok2vec.
+SHARED_TOK2VEC = "tok2vec"
+# Texts longer than this are processed in windows (spaCy's max_length is 1,000,000 chars)
+METADATA_WINDOW_CHARS = 100000
+OBLIGATION_KEYWORDS = ["shall", "must", "agree", "undertake", "liable"]
+# More Devanagari characters than this and a contract is treated as Hindi
+HINDI_MIN_CHARS = 50
+# Clause numbering ('1.', '2.1', '12.3.1', 'SECTION 4', 'ARTICLE IV') and sentence ends (incl. the Hindi danda).
+# The boundary is the line break before a heading; the heading itself stays with its clause.
+CLAUSE_HEADING = r'(?:\d+(?:\.\d+)*\.?|SECTION\s+\d+|ARTICLE\s+[IVX]+)\s+'
+CLAUSE_BOUNDARY = re.compile(r'(?:^|\n)\s*(?=%s)' % CLAUSE_HEADING, re.IGNORECASE)
+CLAUSE_NUMBER = re.compile(r'^%s' % CLAUSE_HEADING, re.IGNORECASE)
+SENTENCE_END = re.compile(r'(?<=[.;:\u0964])\s+')
+
+# --- PROCESS-WIDE PIPELINE ---
+_shared_nlp = None
+_nlp_lock = threading.Lock()
+_pipeline_stats: Dict[str, Any] = {}
+
+def _rss_mb() -> Optional[float]:
+    """Current resident memory of this process in MB (Linux), else None."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def _tok2vec_listeners(nlp) -> List[str]:
+    """Kept components (enabled or not) that read their features from the shared tok2vec."""
+    listeners = []
+    for name, component in nlp.components:
+        model = getattr(component, "model", None)
+        if model is None or not hasattr(model, "walk"):
+            continue
+        if any(isinstance(node, Tok2VecListener) and node.upstream_name in (SHARED_TOK2VEC, "*")
+               for node in model.walk()):
+            listeners.append(name)
+    return listeners
+
+def _load_pipeline():
+    exclude = EXCLUDED_COMPONENTS + [SHARED_TOK2VEC]
+    try:
+        nlp = spacy.load(SPACY_MODEL, exclude=exclude)
+    except OSError:
+        # Auto-download if missing
+        from spacy.cli import download
+        download(SPACY_MODEL)
+        nlp = spacy.load(SPACY_MODEL, exclude=exclude)
+
+    # A model whose ner/senter does listen to tok2vec can't run without it: load it back
+    if _tok2vec_listeners(nlp):
+        nlp = spacy.load(SPACY_MODEL, exclude=EXCLUDED_COMPONENTS)
+
+    # Without the parser, sentence boundaries come from the (normally disabled) senter
+    if "senter" in nlp.disabled:
+        nlp.enable_pipe("senter")
+    elif not nlp.has_pipe("senter"):
+        nlp.add_pipe("sentencizer")
+    return nlp
+
+def get_shared_nlp():
+    """
+    Loads the spaCy pipeline once per process and hands the same object to
+    every LegalNLPEngine. Load time and memory cost are recorded in pipeline_stats().
+    """
+    global _shared_nlp
+    if _shared_nlp is None:
+        with _nlp_lock:
+            if _shared_nlp is None:
+                rss_before = _rss_mb()
+                start = time.perf_counter()
+                nlp = _load_pipeline()
+                _pipeline_stats.update({
+                    "model": SPACY_MODEL,
+                    "components": list(nlp.pipe_names),
+                    "load_seconds": round(time.perf_counter() - start, 3),
+                    "rss_mb_before": rss_before,
+                    "rss_mb_after": _rss_mb()
+                })
+                _shared_nlp = nlp
+    return _shared_nlp
+
+def pipeline_stats() -> Dict[str, Any]:
+    return dict(_pipeline_stats)
 
 class LegalNLPEngine:
     """
@@ -8,31 +105,101 @@ class LegalNLPEngine:
     Uses spaCy for fast entity extraction and Regex for clause segmentation.
     """
     def __init__(self):
-        try:
-            self.nlp = spacy.load("en_core_web_sm")
-        except OSError:
-            # Auto-download if missing
-            from spacy.cli import download
-            download("en_core_web_sm")
-            self.nlp = spacy.load("en_core_web_sm")
-
-    def detect_language(self, text: str) -> str:
-        # Checks for Hindi Unicode characters
-        hindi_chars = re.findall(r'[\u0900-\u097F]', text)
-        return "Hindi" if len(hindi_chars) > 50 else "English"
+        # Cheap after the first call: the pipeline is shared process-wide
+        self.nlp = get_shared_nlp()
+
+    @staticmethod
+    def prewarm():
+        """
+        Startup hook for the Streamlit server: loads the pipeline and runs one
+        tiny document through it so the first real request pays no cold start.
+        """
+        start = time.perf_counter()
+        nlp = get_shared_nlp()
+        nlp("Warm-up: Acme Pvt Ltd shall pay Rs. 10,000 on 1 April 2025.")
+        _pipeline_stats["prewarm_seconds"] = round(time.perf_counter() - start, 3)
+
+    @staticmethod
+    @traced("nlp.language")
+    def detect_language(text: str) -> str:
+        # Checks for Hindi Unicode characters; stops counting once the answer is known
+        hindi_chars = count_script(text, "devanagari", limit=HINDI_MIN_CHARS)
+        return "Hindi" if hindi_chars > HINDI_MIN_CHARS else "English"
 
     def extract_metadata(self, text: str) -> Dict[str, Any]:
         """
         Extracts: Parties (ORG), Money (MONEY), Dates (DATE).
+        Long contracts are fed through spaCy in clause-aligned windows, which
+        keeps them under nlp.max_length and lets nlp.pipe batch them.
+        """
+        return self.extract_metadata_batch([text])[0]
+
+    def extract_metadata_batch(self, texts: Iterable[str], batch_size: int = 32,
+                               n_process: int = 1) -> List[Dict[str, Any]]:
+        """
+        Batch API for multi-document workloads (portfolio re-scans, or the
+        clause list from segment_clauses). Every text is split into windows,
+        all windows stream through one nlp.pipe call, and the results are
+        regrouped per input text, in input order.
+        Set n_process > 1 to use several cores.
+        """
+        texts = list(texts)
+
+        def windows():
+            for idx, text in enumerate(texts):
+                if len(text) <= METADATA_WINDOW_CHARS:
+                    yield text, idx
+                else:
+                    for window in self.build_windows(text, METADATA_WINDOW_CHARS):
+                        yield window, idx
+
+        results = [self._empty_metadata() for _ in texts]
+        with span("nlp.metadata") as sp:
+            for doc, idx in self.nlp.pipe(windows(), as_tuples=True, batch_size=batch_size, n_process=n_process):
+                self._collect_metadata(doc, results[idx])
+            sp.set(chars=sum(len(t) for t in texts))
+
+        for metadata in results:
+            self._dedupe_metadata(metadata)
+        return results
+
+    def annotate(self, text: str) -> List[Any]:
         """
-        doc = self.nlp(text)
-        metadata = {
+        The spaCy Docs behind extract_metadata (one per window), for callers
+        that want to keep the annotations, e.g. as a DocBin in the artifact cache.
+        """
+        windows = [text] if len(text) <= METADATA_WINDOW_CHARS else self.build_windows(text, METADATA_WINDOW_CHARS)
+        with span("nlp.annotate") as sp:
+            docs = list(self.nlp.pipe(windows))
+            sp.set(chars=len(text))
+        return docs
+
+    @staticmethod
+    def metadata_from_docs(docs: Iterable[Any]) -> Dict[str, Any]:
+        """extract_metadata() result rebuilt from already-annotated Docs (no model run)."""
+        metadata = LegalNLPEngine._empty_metadata()
+        for doc in docs:
+            LegalNLPEngine._collect_metadata(doc, metadata)
+        LegalNLPEngine._dedupe_metadata(metadata)
+        return metadata
+
+    @staticmethod
+    def _dedupe_metadata(metadata: Dict[str, Any]) -> None:
+        # Remove duplicates
+        metadata["parties"] = list(set(metadata["parties"]))
+        metadata["money"] = list(set(metadata["money"]))
+
+    @staticmethod
+    def _empty_metadata() -> Dict[str, Any]:
+        return {
             "parties": [],
             "dates": [],
             "money": [],
             "obligations": [] # To be filled by keywords
         }
 
+    @staticmethod
+    def _collect_metadata(doc, metadata: Dict[str, Any]) -> None:
         for ent in doc.ents:
             if ent.label_ == "ORG":
                 metadata["parties"].append(ent.text)
@@ -40,25 +207,57 @@ class LegalNLPEngine:
                 metadata["dates"].append(ent.text)
             elif ent.label_ == "MONEY":
                 metadata["money"].append(ent.text)
-        
+
         # Simple rule-based obligation detector (Advanced Feature)
-        keywords = ["shall", "must", "agree", "undertake", "liable"]
         for sent in doc.sents:
-            if any(k in sent.text.lower() for k in keywords):
-                if len(sent.text) < 200: 
+            if any(k in sent.text.lower() for k in OBLIGATION_KEYWORDS):
+                if len(sent.text) < 200:
                     metadata["obligations"].append(sent.text)
 
-        # Remove duplicates
-        metadata["parties"] = list(set(metadata["parties"]))
-        metadata["money"] = list(set(metadata["money"]))
-        
-        return metadata
-
-    def segment_clauses(self, text: str) -> List[str]:
+    @staticmethod
+    def segment_clauses(text: str) -> List[str]:
         """
         Crucial: Splits legal blob into analyze-able chunks.
-        Looks for patterns like '1.', '2.1', 'ARTICLE I'.
+        Looks for patterns like '1.', '2.1', 'ARTICLE I' at line starts. Each
+        clause keeps its heading, so it can be cited as "clause 12.3", and no
+        text is dropped: short clauses ("80. Vendor liability is unlimited.")
+        are often the ones an audit most needs to see.
         """
-        pattern = r'(?:\n\s*|^)(?:\d+\.?\d*|SECTION\s+\d+|ARTICLE\s+[IVX]+)\s+'
-        segments = re.split(pattern, text, flags=re.IGNORECASE)
-        return [s.strip() for s in segments if len(s.strip()) > 50]
\ No newline at end of file
+        return [s.strip() for s in CLAUSE_BOUNDARY.split(text) if s.strip()]
+
+    @staticmethod
+    def build_windows(text: str, max_chars: int = 20000) -> List[str]:
+        """
+        Packs consecutive clauses into windows of at most `max_chars`.
+        Windows always end on a clause boundary; a single clause longer than
+        the window (common in text without line breaks) is split
+        on sentence ends instead, and only cut mid-sentence as a last resort.
+        """
+        clauses = LegalNLPEngine.segment_clauses(text) or [text.strip()]
+        return LegalNLPEngine.pack_windows(clauses, max_chars)
+
+    @staticmethod
+    def pack_windows(clauses: List[str], max_chars: int = 20000) -> List[str]:
+        """build_windows() for text that is already split into clauses."""
+        pieces = []
+        for clause in clauses:
+            if len(clause) <= max_chars:
+                pieces.append(clause)
+                continue
+            for sent in SENTENCE_END.split(clause):
+                while len(sent) > max_chars:
+                    pieces.append(sent[:max_chars])
+                    sent = sent[max_chars:]
+                if sent:
+                    pieces.append(sent)
+
+        windows, current, size = [], [], 0
+        for piece in pieces:
+            if current and size + len(piece) + 1 > max_chars:
+                windows.append("\n".join(current))
+                current, size = [], 0
+            current.append(piece)
+            size += len(piece) + 1
+        if current:
+            windows.append("\n".join(current))
+        return windows
\ No newline at end of file
@@ -0,0 +1,140 @@
+import hashlib
+import io
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+import pdfplumber
+import pypdfium2 as pdfium
+from pdfminer.pdftypes import resolve1
+
+from core.cache import DiskCache, make_key
+from core.tracing import span
+
+# Optional: local OCR for scanned PDFs (pip install pytesseract + the tesseract binary
+# with the eng and hin traineddata). Without it scanned PDFs are rejected as before.
+try:
+    import pytesseract
+except ImportError:
+    pytesseract = None
+
+OCR_LANGS = os.getenv("OCR_LANGS", "eng+hin")
+OCR_DPI = int(os.getenv("OCR_DPI", "300"))
+OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or os.cpu_count() or 1
+# Never fork the threaded server process (same start method as the PDF text pool)
+POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn")
+
+_ocr_cache = None
+
+def get_ocr_cache() -> DiskCache:
+    global _ocr_cache
+    if _ocr_cache is None:
+        _ocr_cache = DiskCache(
+            "ocr",
+            max_entries=int(os.getenv("OCR_CACHE_MAX_ENTRIES", "5000")),
+            ttl_seconds=float(os.getenv("OCR_CACHE_TTL_SECONDS", str(90 * 24 * 3600)))
+        )
+    return _ocr_cache
+
+
+@lru_cache(maxsize=1)
+def ocr_languages() -> Optional[str]:
+    """The OCR_LANGS the installed tesseract can read ("eng+hin"), or None if OCR is unavailable."""
+    if pytesseract is None:
+        return None
+    try:
+        installed = set(pytesseract.get_languages(config=""))
+    except Exception:  # tesseract binary missing
+        return None
+    langs = [lang for lang in OCR_LANGS.split("+") if lang in installed]
+    return "+".join(langs) or None
+
+
+# --- PROCESS-POOL WORKER STATE ---
+# Same pattern as the PDF text workers: the bytes arrive once per worker.
+_worker_pdf = None
+_worker_langs = None
+
+def _init_ocr_worker(pdf_bytes: bytes, langs: str):
+    global _worker_pdf, _worker_langs
+    # One tesseract thread per process; the pool already uses every core
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+    _worker_pdf = pdfium.PdfDocument(pdf_bytes)
+    _worker_langs = langs
+
+def _ocr_page(index: int) -> str:
+    return _render_and_ocr(_worker_pdf, index, _worker_langs)
+
+def _render_and_ocr(pdf, index: int, langs: str) -> str:
+    page = pdf[index]
+    try:
+        image = page.render(scale=OCR_DPI / 72).to_pil()
+        return pytesseract.image_to_string(image, lang=langs)
+    finally:
+        page.close()
+
+
+def page_fingerprint(page) -> str:
+    """Hash of what a pdfplumber page draws (content streams + embedded images) and its geometry."""
+    h = hashlib.sha256(f"{page.width}x{page.height}@{page.rotation}".encode())
+    contents = page.page_obj.contents or []
+    for stream in contents:
+        h.update(resolve1(stream).get_data())
+    for image in page.images:
+        h.update(image["stream"].get_rawdata() or b"")
+    return h.hexdigest()
+
+
+def ocr_pages(pdf_bytes: bytes, indexes: List[int], workers: Optional[int] = None) -> Dict[int, str]:
+    """
+    OCR text of the given (0-based) pages. Results are cached per page
+    fingerprint, so a re-uploaded scan, or the same stamp-paper page in
+    another file, is not OCR'd twice. Pages without images are skipped (a
+    blank page has nothing to read). Misses are rendered and OCR'd in a
+    process pool, one page per task. Returns {} when OCR is not installed.
+    """
+    langs = ocr_languages()
+    if langs is None or not indexes:
+        return {}
+
+    cache = get_ocr_cache()
+    results: Dict[int, str] = {}
+    keys: Dict[int, str] = {}
+    with span("parse.ocr") as sp:
+        with pdfplumber.open(io.BytesIO(pdf_bytes)) as pdf:
+            for i in indexes:
+                page = pdf.pages[i]
+                if page.images:
+                    keys[i] = make_key(page_fingerprint(page), langs, OCR_DPI)
+                page.flush_cache()
+        for i, key in keys.items():
+            cached = cache.get(key)
+            if cached is not None:
+                results[i] = cached
+        missing = [i for i in keys if i not in results]
+        sp.set(pages=len(keys), cached=len(keys) - len(missing))
+
+        workers = min(workers or OCR_WORKERS, len(missing))
+        pool = document = None
+        if not missing:
+            texts = iter(())
+        elif workers <= 1:
+            document = pdfium.PdfDocument(pdf_bytes)
+            texts = (_render_and_ocr(document, i, langs) for i in missing)
+        else:
+            pool = ProcessPoolExecutor(max_workers=workers, mp_context=POOL_CONTEXT,
+                                       initializer=_init_ocr_worker, initargs=(pdf_bytes, langs))
+            texts = pool.map(_ocr_page, missing)
+        try:
+            for i, text in zip(missing, texts):
+                results[i] = text
+                cache.set(keys[i], text)
+        finally:
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)
+            if document is not None:
+                document.close()
+    return results
@@ -0,0 +1,215 @@
+import os
+import re
+from typing import Any, Dict, List, NamedTuple
+
+from core.nlp_engine import SENTENCE_END, LegalNLPEngine
+from core.schemas import validate_audit
+
+# Clauses scoring below this are not sent to the LLM on chunked audits (0 = send everything)
+PRESCREEN_THRESHOLD = int(os.getenv("PRESCREEN_THRESHOLD", "40"))
+OFFLINE_MAX_CLAUSES = 4
+QUOTE_CHARS = 300
+
+
+class RiskRule(NamedTuple):
+    pattern: str
+    weight: int
+    explanation_english: str
+    explanation_hindi: str
+    recommendation: str
+
+
+# Known SME risk patterns under Indian law. English and Hindi (Devanagari) wording.
+RISK_RULES: Dict[str, RiskRule] = {
+    "unlimited_liability": RiskRule(
+        r"\bunlimited\s+liabilit(?:y|ies)\b|\bliabilit(?:y|ies)\s+(?:\w+\s+){0,3}unlimited\b"
+        r"|\bwithout\s+(?:any\s+)?limitation\s+of\s+liability\b"
+        r"|\bany\s+and\s+all\s+(?:losses|damages|claims|liabilities)\b|असीमित",
+        90,
+        "Unlimited liability: exposure is not capped.",
+        "असीमित दायित्व: जोखिम की कोई सीमा नहीं है।",
+        "Negotiate a liability cap, e.g. 100% of the total contract value."
+    ),
+    "unilateral_termination": RiskRule(
+        r"\bterminat\w*\s+(?:this\s+agreement\s+)?(?:at\s+any\s+time|for\s+any\s+reason|for\s+convenience"
+        r"|without\s+(?:prior\s+)?(?:notice|cause))|एकतरफा",
+        85,
+        "Unilateral termination: the other party can exit without notice or cause.",
+        "एकतरफा समाप्ति: दूसरा पक्ष बिना सूचना या कारण के अनुबंध समाप्त कर सकता है।",
+        "Require a mutual notice period of at least 30 days."
+    ),
+    "foreign_arbitration": RiskRule(
+        r"\barbitrat\w*[^.]{0,120}?\b(?:singapore|london|new\s+york|hong\s+kong|paris|geneva|dubai)\b",
+        75,
+        "Arbitration seated abroad: disputes become expensive for an Indian SME.",
+        "विदेश में मध्यस्थता: विवाद समाधान बहुत महंगा हो सकता है।",
+        "Seat arbitration in India under the Arbitration and Conciliation Act, 1996."
+    ),
+    "non_compete": RiskRule(
+        r"\bnon[-\s]?compet\w*|\bshall\s+not\s+(?:directly\s+or\s+indirectly\s+)?compete\b|\bnon[-\s]?solicit\w*",
+        75,
+        "Restraint of trade: post-contract non-compete terms are void under Section 27.",
+        "व्यापार पर रोक: धारा 27 के तहत अनुबंध के बाद की गैर-प्रतिस्पर्धा शर्तें शून्य हैं।",
+        "Limit restrictions to the term of the contract and to confidential information."
+    ),
+    "indemnity": RiskRule(
+        r"\bindemnif(?:y|ies|ied|ication)\b|\bhold\s+harmless\b|क्षतिपूर्ति",
+        70,
+        "Indemnity: you may have to cover the other party's losses.",
+        "क्षतिपूर्ति: आपको दूसरे पक्ष के नुकसान की भरपाई करनी पड़ सकती है।",
+        "Make the indemnity mutual and limit it to losses caused by your breach."
+    ),
+    "unilateral_amendment": RiskRule(
+        r"\b(?:may|reserves\s+the\s+right\s+to)\s+(?:unilaterally\s+)?(?:amend|modify|change|vary)\s+"
+        r"(?:this\s+agreement|these\s+terms|the\s+terms)",
+        65,
+        "Unilateral amendment: terms can be changed without your consent.",
+        "एकतरफा संशोधन: आपकी सहमति के बिना शर्तें बदली जा सकती हैं।",
+        "Require written amendments signed by both parties."
+    ),
+    "waiver_of_rights": RiskRule(
+        r"\bwaive[sd]?\s+(?:any\s+and\s+all|any|all)\s+(?:rights?|claims?|remed(?:y|ies))\b",
+        65,
+        "Waiver: you give up legal rights or remedies.",
+        "अधिकारों का त्याग: आप अपने कानूनी अधिकार छोड़ रहे हैं।",
+        "Delete the waiver or restrict it to specific, listed claims."
+    ),
+    "ip_assignment": RiskRule(
+        r"\b(?:assigns?|transfers?)\s+(?:to\s+the\s+\w+\s+)?(?:all\s+)?(?:right,?\s+title\s+and\s+interest"
+        r"|intellectual\s+property)",
+        60,
+        "IP assignment: ownership of your work or pre-existing IP may pass to the other party.",
+        "बौद्धिक संपदा हस्तांतरण: आपके काम का स्वामित्व दूसरे पक्ष को जा सकता है।",
+        "Exclude pre-existing IP and tie the assignment to full payment."
+    ),
+    "penalty": RiskRule(
+        r"\bliquidated\s+damages\b|\bpenalt(?:y|ies)\b|\blate\s+(?:payment\s+)?fees?\b|जुर्माना",
+        55,
+        "Penalty: only reasonable compensation is enforceable under Section 74.",
+        "जुर्माना: धारा 74 के तहत केवल उचित मुआवजा ही लागू होता है।",
+        "Cap penalties at a reasonable pre-estimate of actual loss."
+    ),
+    "sole_discretion": RiskRule(
+        r"\bsole\s+(?:and\s+absolute\s+)?discretion\b|\babsolute\s+discretion\b",
+        55,
+        "Sole discretion: key decisions rest entirely with the other party.",
+        "पूर्ण विवेक: महत्वपूर्ण निर्णय पूरी तरह दूसरे पक्ष के हाथ में हैं।",
+        "Replace with 'reasonable discretion' and objective criteria."
+    ),
+    "payment_withholding": RiskRule(
+        r"\bwithhold\w*\s+(?:any\s+)?(?:payment|fees?|amounts?)\b|\bset[-\s]?off\b",
+        50,
+        "Withholding / set-off: payments to you can be held back.",
+        "भुगतान रोकना: आपको मिलने वाला भुगतान रोका जा सकता है।",
+        "Allow withholding only for undisputed, documented amounts."
+    ),
+    "auto_renewal": RiskRule(
+        r"\bautomatic(?:ally)?\s+renew\w*|\bauto[-\s]?renew\w*",
+        50,
+        "Automatic renewal: the contract continues unless cancelled in time.",
+        "स्वतः नवीनीकरण: समय पर रद्द न करने पर अनुबंध जारी रहता है।",
+        "Require explicit renewal or a reminder before the renewal date."
+    ),
+    "exclusive_jurisdiction": RiskRule(
+        r"\bexclusive\s+jurisdiction\b",
+        45,
+        "Exclusive jurisdiction: disputes must be fought in the other party's chosen courts.",
+        "अनन्य क्षेत्राधिकार: विवाद केवल दूसरे पक्ष की चुनी अदालतों में चलेंगे।",
+        "Choose courts in your own city or a neutral venue."
+    ),
+}
+
+# All rules compiled into ONE alternation: a single scan per clause finds every rule,
+# and match.lastgroup says which one fired.
+RISK_AUTOMATON = re.compile(
+    "|".join(f"(?P<{name}>{rule.pattern})" for name, rule in RISK_RULES.items()),
+    re.IGNORECASE
+)
+
+
+class ClauseScreen(NamedTuple):
+    text: str
+    score: int
+    rules: List[str]
+
+
+class RiskPrescreener:
+    """
+    Local, offline risk pre-scorer for contract clauses.
+    Every clause is scanned once by RISK_AUTOMATON; its score is the weight of the
+    worst rule matched plus a small bump for each additional distinct risk.
+    Used to keep boilerplate (notices, counterparts, definitions) away from the
+    LLM and as the offline fallback when no provider answers.
+    """
+    def score_clause(self, clause: str) -> ClauseScreen:
+        rules = []
+        for match in RISK_AUTOMATON.finditer(clause):
+            if match.lastgroup not in rules:
+                rules.append(match.lastgroup)
+        if not rules:
+            return ClauseScreen(clause, 0, [])
+        rules.sort(key=lambda name: RISK_RULES[name].weight, reverse=True)
+        score = min(100, RISK_RULES[rules[0]].weight + 5 * (len(rules) - 1))
+        return ClauseScreen(clause, score, rules)
+
+    def score_segments(self, segments: List[str]) -> List[ClauseScreen]:
+        return [self.score_clause(segment) for segment in segments]
+
+    def filter_clauses(self, segments: List[str], threshold: int = PRESCREEN_THRESHOLD) -> List[str]:
+        """Clauses worth an LLM review, in document order."""
+        if threshold <= 0:
+            return segments
+        return [s.text for s in self.score_segments(segments) if s.score >= threshold]
+
+    @staticmethod
+    def quote(screen: ClauseScreen) -> str:
+        """The sentence where the clause's worst rule fired, at most QUOTE_CHARS long."""
+        text = screen.text
+        if len(text) <= QUOTE_CHARS:
+            return text
+        match = next(m for m in RISK_AUTOMATON.finditer(text) if m.lastgroup == screen.rules[0])
+        start, end = 0, len(text)
+        for boundary in SENTENCE_END.finditer(text):
+            if boundary.end() <= match.start():
+                start = boundary.end()
+            elif boundary.start() >= match.end():
+                end = boundary.start()
+                break
+        if end - start > QUOTE_CHARS:
+            start = max(start, match.start() - QUOTE_CHARS // 3)
+            end = start + QUOTE_CHARS
+        return text[start:end].strip()
+
+    def audit(self, contract_text: str) -> Dict[str, Any]:
+        """Rule-based audit in the AuditResult shape, for when no LLM is reachable."""
+        segments = LegalNLPEngine.segment_clauses(contract_text)
+        if len(segments) < 2:
+            # Unnumbered text: score sentence by sentence rather than as one block
+            segments = [s for s in SENTENCE_END.split(contract_text.strip()) if s.strip()] or [contract_text.strip()]
+        flagged = sorted((s for s in self.score_segments(segments) if s.score > 0),
+                         key=lambda s: s.score, reverse=True)
+        overall = flagged[0].score if flagged else 0
+        level = "High" if overall >= 70 else "Medium" if overall >= 40 else "Low"
+        found = sorted({rule for s in flagged for rule in s.rules}, key=lambda r: RISK_RULES[r].weight, reverse=True)
+        names = ", ".join(name.replace("_", " ") for name in found) or "none"
+
+        clauses = []
+        for screen in flagged[:OFFLINE_MAX_CLAUSES]:
+            rule = RISK_RULES[screen.rules[0]]
+            clauses.append({
+                "original_text": self.quote(screen),
+                "risk_score": screen.score,
+                "explanation_english": rule.explanation_english,
+                "explanation_hindi": rule.explanation_hindi,
+                "recommendation": rule.recommendation
+            })
+
+        return validate_audit({
+            "overall_score": overall,
+            "risk_level": level,
+            "summary_english": f"OFFLINE PRE-SCREEN (AI review unavailable): {len(flagged)} of {len(segments)} "
+                               f"clauses match known risk patterns ({names}).",
+            "summary_hindi": f"ऑफ़लाइन जाँच (AI समीक्षा उपलब्ध नहीं): {len(segments)} में से {len(flagged)} "
+                             f"धाराओं में ज्ञात जोखिम पाए गए।",
+            "clauses": clauses
+        })
@@ -0,0 +1,129 @@
+import os
+import re
+from typing import Dict, List, NamedTuple, Optional
+
+from core.text_normalizer import count_script, normalize_whitespace
+
+# Optional exact tokenizer; the local estimate below is used without it
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")
+except Exception:
+    _encoding = None
+
+
+class ModelProfile(NamedTuple):
+    context_tokens: int
+    latency_class: int  # 1 = fast/cheap ... 3 = slow/expensive
+
+
+# Context windows and rough speed/cost tiers of the MODEL_PRIORITY models.
+# Unknown models are treated as large-context, mid-tier.
+MODEL_PROFILES: Dict[str, ModelProfile] = {
+    "gemini-2.5-flash-lite": ModelProfile(1_048_576, 1),
+    "gemini-2.0-flash-lite": ModelProfile(1_048_576, 1),
+    "llama3-70b-8192": ModelProfile(8_192, 1),
+    "mixtral-8x7b-32768": ModelProfile(32_768, 1),
+    "gemini-2.5-flash": ModelProfile(1_048_576, 2),
+    "gemini-flash-latest": ModelProfile(1_048_576, 2),
+    "gpt-4o-mini": ModelProfile(128_000, 2),
+    "gemini-pro-latest": ModelProfile(1_048_576, 3),
+    "gpt-4o": ModelProfile(128_000, 3),
+}
+DEFAULT_PROFILE = ModelProfile(128_000, 2)
+
+# Tokens kept free for the answer when checking whether a prompt fits a model
+RESERVED_OUTPUT_TOKENS = int(os.getenv("LLM_RESERVED_OUTPUT_TOKENS", "2048"))
+# Default size of chat/drafter/translation prompts: small enough for every model in the list
+PROMPT_TOKEN_BUDGET = int(os.getenv("LLM_PROMPT_TOKEN_BUDGET", "6000"))
+
+# Headers/footers that repeat on every page of exported contracts and carry no meaning.
+# Only complete forms: a line holding nothing but "Page 3" / "- 3 -", or "Page 3 of 12"
+# anywhere. A reference in the body ("set out on page 5 of Schedule A") is kept.
+PAGE_FURNITURE = re.compile(
+    r'^[ \t]*(?i:page\s+\d+|-\s*\d+\s*-)[ \t]*$'
+    r'|\b(?:Page|PAGE)\s+\d+\s+(?:of|OF)\s+\d+\b'
+    r'|(?i:\bconfidential\s*[-–—:]\s*(?:do\s+not\s+(?:distribute|copy)|for\s+internal\s+use\s+only)\b)'
+    r'|(?i:\bthis\s+page\s+(?:has\s+been\s+)?(?:intentionally\s+)?left\s+blank\b)',
+    re.MULTILINE
+)
+SENTENCE_SPLIT = re.compile(r'(?<=[.;:!?।])\s+')
+# Sentences shorter than this may legitimately repeat ("Not applicable.")
+MIN_DEDUP_CHARS = 40
+
+
+def count_tokens(text: str) -> int:
+    """
+    Local token count. Exact (cl100k) when tiktoken is installed, otherwise an
+    estimate: ~4 characters per token for Latin text, ~2 for Devanagari, which
+    BPE vocabularies split much more finely.
+    """
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    devanagari = count_script(text)
+    return (len(text) - devanagari) // 4 + devanagari // 2 + 1
+
+
+def compact_text(text: str) -> str:
+    """
+    Drops what costs tokens but adds nothing: whitespace runs, page headers and
+    footers, and sentences repeated verbatim (boilerplate pasted into every
+    schedule). The first occurrence of every sentence is kept, in order.
+    """
+    text = normalize_whitespace(PAGE_FURNITURE.sub(" ", text))
+    seen = set()
+    kept = []
+    for sentence in SENTENCE_SPLIT.split(text):
+        if len(sentence) >= MIN_DEDUP_CHARS:
+            fingerprint = sentence.lower()
+            if fingerprint in seen:
+                continue
+            seen.add(fingerprint)
+        kept.append(sentence)
+    return " ".join(kept)
+
+
+def fit_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of `text` within max_tokens, cut at a sentence end where possible."""
+    if count_tokens(text) <= max_tokens:
+        return text
+    # Scale by the measured chars/token ratio, then back off to a sentence boundary
+    limit = max(0, int(len(text) * max_tokens / max(count_tokens(text), 1)))
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("। "))
+    if boundary > limit // 2:
+        cut = cut[:boundary + 1]
+    while cut and count_tokens(cut) > max_tokens:
+        cut = cut[:int(len(cut) * 0.9)]
+    return cut
+
+
+def build_prompt(template: str, budget_tokens: Optional[int] = None, compress: str = "context", **fields: str) -> str:
+    """
+    Fills `template` (str.format) so the whole prompt stays within budget_tokens.
+    The `compress` field is compacted (see compact_text) and, if still too big,
+    trimmed; every other field is used as given.
+    """
+    budget = budget_tokens or PROMPT_TOKEN_BUDGET
+    if compress in fields:
+        fields[compress] = compact_text(fields[compress])
+        fixed = count_tokens(template.format(**dict(fields, **{compress: ""})))
+        fields[compress] = fit_tokens(fields[compress], max(0, budget - fixed))
+    return template.format(**fields)
+
+
+def profile(model_name: str) -> ModelProfile:
+    return MODEL_PROFILES.get(model_name, DEFAULT_PROFILE)
+
+
+def route_models(models: List[str], prompt_tokens: int, output_tokens: int = RESERVED_OUTPUT_TOKENS) -> List[str]:
+    """
+    Models whose context window holds the prompt plus the answer, fastest
+    class first (priority order kept within a class). Short questions go to
+    fast small-context models; long payloads only reach models that fit them.
+    """
+    needed = prompt_tokens + output_tokens
+    fitting = [m for m in models if profile(m).context_tokens >= needed]
+    return sorted(fitting, key=lambda m: profile(m).latency_class)
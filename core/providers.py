@@ -0,0 +1,257 @@
+import os
+import asyncio
+import threading
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional
+
+import google.generativeai as genai
+from dotenv import load_dotenv
+
+from core.prompt_budget import count_tokens
+from core.rate_limit import build_limiters
+from core.tracing import span
+
+# Safe Imports for Backups
+try:
+    from openai import OpenAI, AsyncOpenAI
+except ImportError:
+    OpenAI = AsyncOpenAI = None
+
+try:
+    from groq import Groq, AsyncGroq
+except ImportError:
+    Groq = AsyncGroq = None
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+# Load Environment
+load_dotenv()
+
+# Keep-alive pool shared by every OpenAI/Groq request in the process
+MAX_CONNECTIONS = int(os.getenv("LLM_MAX_CONNECTIONS", "20"))
+REQUEST_TIMEOUT = float(os.getenv("LLM_REQUEST_TIMEOUT", "60"))
+# Threads for blocking Gemini calls made from async code (asyncio's default pool is tiny)
+_gemini_executor = ThreadPoolExecutor(max_workers=MAX_CONNECTIONS, thread_name_prefix="gemini")
+# Expected answer size, charged against the TPM bucket on top of the prompt
+EXPECTED_OUTPUT_TOKENS = 1500
+
+
+def provider_for(model_name: str) -> Optional[str]:
+    if "gemini" in model_name:
+        return "gemini"
+    elif "gpt" in model_name:
+        return "openai"
+    elif "llama" in model_name or "mixtral" in model_name:
+        return "groq"
+    return None
+
+
+def _pooled_http_client(async_client: bool = False):
+    if httpx is None:
+        return None
+    client_cls = httpx.AsyncClient if async_client else httpx.Client
+    return client_cls(
+        limits=httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_CONNECTIONS),
+        timeout=REQUEST_TIMEOUT
+    )
+
+
+def estimate_tokens(text: str) -> int:
+    # Same local count the prompt builder uses (Devanagari-aware)
+    return count_tokens(text)
+
+
+class ProviderPool:
+    """
+    Long-lived LLM clients for Gemini, OpenAI and Groq, built once per process
+    and shared by LegalRiskEngine and generate_smart_fallback.
+    - genai is configured once; GenerativeModel objects are cached per model name.
+    - OpenAI/Groq clients sit on keep-alive HTTP connection pools, so repeat
+      calls skip TCP/TLS setup.
+    - generate_async() is the asyncio twin of generate(); every async call
+      first waits on the provider's RPM/TPM token buckets.
+    """
+    def __init__(self):
+        self.gemini_key = os.getenv("GEMINI_API_KEY")
+        self._gemini_models: Dict[str, "genai.GenerativeModel"] = {}
+        self._lock = threading.Lock()
+        self.limiters = build_limiters()
+        self.openai_key = os.getenv("OPENAI_API_KEY") or os.getenv("OPEN_API_KEY")
+        self.groq_key = os.getenv("GROQ_API_KEY")
+        # Async HTTP clients are bound to the event loop that opened their
+        # connections, so they are created lazily per loop.
+        self._async_clients = weakref.WeakKeyDictionary()
+
+        # Google Setup
+        try:
+            if self.gemini_key:
+                genai.configure(api_key=self.gemini_key)
+        except:
+            self.gemini_key = None
+
+        # OpenAI Setup (Auto-fix for your "OPEN_API_KEY" typo)
+        self.openai_client = None
+        if OpenAI and self.openai_key:
+            try:
+                self.openai_client = OpenAI(api_key=self.openai_key, http_client=_pooled_http_client())
+            except:
+                pass
+
+        # Groq Setup
+        self.groq_client = None
+        if Groq and self.groq_key:
+            try:
+                self.groq_client = Groq(api_key=self.groq_key, http_client=_pooled_http_client())
+            except:
+                pass
+
+    def is_available(self, model_name: str) -> bool:
+        """True if the provider behind `model_name` has a configured client."""
+        provider = provider_for(model_name)
+        if provider == "gemini":
+            return bool(self.gemini_key)
+        elif provider == "openai":
+            return self.openai_client is not None
+        elif provider == "groq":
+            return self.groq_client is not None
+        return False
+
+    def gemini_model(self, model_name: str):
+        model = self._gemini_models.get(model_name)
+        if model is None:
+            with self._lock:
+                model = self._gemini_models.setdefault(model_name, genai.GenerativeModel(model_name))
+        return model
+
+    def generate(self, model_name: str, prompt: str) -> str:
+        """One blocking request to one model. Raises on any provider error."""
+        with span(f"llm.{provider_for(model_name)}") as sp:
+            text = self._generate(model_name, prompt)
+            sp.set(prompt_tokens=estimate_tokens(prompt), response_tokens=estimate_tokens(text or ""))
+            return text
+
+    def _generate(self, model_name: str, prompt: str) -> str:
+        provider = provider_for(model_name)
+
+        # --- GOOGLE GEMINI ---
+        if provider == "gemini":
+            response = self.gemini_model(model_name).generate_content(prompt)
+            return response.text
+
+        # --- OPENAI GPT ---
+        elif provider == "openai":
+            response = self.openai_client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.7
+            )
+            return response.choices[0].message.content
+
+        # --- GROQ ---
+        elif provider == "groq":
+            chat_completion = self.groq_client.chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model_name,
+            )
+            return chat_completion.choices[0].message.content
+
+        raise ValueError(f"Unknown model: {model_name}")
+
+    def stream(self, model_name: str, prompt: str) -> Iterator[str]:
+        """Like generate(), but yields the answer in chunks as the provider produces them."""
+        provider = provider_for(model_name)
+
+        # --- GOOGLE GEMINI ---
+        if provider == "gemini":
+            for chunk in self.gemini_model(model_name).generate_content(prompt, stream=True):
+                try:
+                    text = chunk.text
+                except ValueError:
+                    continue  # Chunk without text parts (e.g. safety metadata)
+                if text:
+                    yield text
+            return
+
+        # --- OPENAI GPT / GROQ (same chat-completions streaming API) ---
+        elif provider in ("openai", "groq"):
+            client = self.openai_client if provider == "openai" else self.groq_client
+            extra = {"temperature": 0.7} if provider == "openai" else {}
+            events = client.chat.completions.create(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                stream=True,
+                **extra
+            )
+            for event in events:
+                if event.choices and event.choices[0].delta.content:
+                    yield event.choices[0].delta.content
+            return
+
+        raise ValueError(f"Unknown model: {model_name}")
+
+    def _async_client(self, provider: str):
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._async_clients.setdefault(loop, {})
+            if provider not in clients:
+                if provider == "openai":
+                    clients[provider] = AsyncOpenAI(api_key=self.openai_key, http_client=_pooled_http_client(async_client=True))
+                else:
+                    clients[provider] = AsyncGroq(api_key=self.groq_key, http_client=_pooled_http_client(async_client=True))
+            return clients[provider]
+
+    async def generate_async(self, model_name: str, prompt: str) -> str:
+        """Non-blocking generate(): rate-limited per provider, then awaited."""
+        provider = provider_for(model_name)
+        if provider in self.limiters:
+            with span(f"llm.{provider}.rate_limit_wait"):
+                await self.limiters[provider].acquire(estimate_tokens(prompt) + EXPECTED_OUTPUT_TOKENS)
+
+        with span(f"llm.{provider}.async") as sp:
+            text = await self._generate_async(provider, model_name, prompt)
+            sp.set(prompt_tokens=estimate_tokens(prompt), response_tokens=estimate_tokens(text or ""))
+            return text
+
+    async def _generate_async(self, provider: Optional[str], model_name: str, prompt: str) -> str:
+        # --- GOOGLE GEMINI ---
+        if provider == "gemini":
+            # genai's async client sticks to the first event loop it sees, which
+            # breaks under Streamlit (one loop per run); use the pooled sync client
+            # in a worker thread instead.
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(_gemini_executor, self._generate, model_name, prompt)
+
+        # --- OPENAI GPT ---
+        elif provider == "openai":
+            response = await self._async_client("openai").chat.completions.create(
+                model=model_name,
+                messages=[{"role": "user", "content": prompt}],
+                temperature=0.7
+            )
+            return response.choices[0].message.content
+
+        # --- GROQ ---
+        elif provider == "groq":
+            chat_completion = await self._async_client("groq").chat.completions.create(
+                messages=[{"role": "user", "content": prompt}],
+                model=model_name,
+            )
+            return chat_completion.choices[0].message.content
+
+        raise ValueError(f"Unknown model: {model_name}")
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_provider_pool() -> ProviderPool:
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ProviderPool()
+    return _pool
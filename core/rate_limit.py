@@ -0,0 +1,78 @@
+import os
+import time
+import asyncio
+import threading
+import weakref
+from typing import Dict
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at `rate_per_minute`.
+    State is guarded by a thread lock and waiting is done with asyncio.sleep,
+    so one bucket can be shared by every event loop in the process
+    (Streamlit runs each script execution on its own loop).
+    """
+    def __init__(self, rate_per_minute: float, capacity: float = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self, amount: float) -> float:
+        """Takes `amount` tokens (possibly going negative); returns seconds to wait."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            # Requests bigger than the bucket would wait forever; cap them to a full bucket
+            amount = min(amount, self.capacity)
+            self.tokens -= amount
+            return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        wait = self._reserve(amount)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+
+class ProviderRateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets for one provider."""
+    def __init__(self, rpm: float, tpm: float):
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+
+    async def acquire(self, tokens: int) -> None:
+        await self.requests.acquire(1)
+        await self.tokens.acquire(tokens)
+
+
+# Default quotas per provider; override per deployment tier in .env
+DEFAULT_LIMITS = {
+    "gemini": (float(os.getenv("GEMINI_RPM", "15")), float(os.getenv("GEMINI_TPM", "250000"))),
+    "openai": (float(os.getenv("OPENAI_RPM", "500")), float(os.getenv("OPENAI_TPM", "200000"))),
+    "groq": (float(os.getenv("GROQ_RPM", "30")), float(os.getenv("GROQ_TPM", "6000"))),
+}
+
+def build_limiters() -> Dict[str, ProviderRateLimiter]:
+    return {name: ProviderRateLimiter(rpm, tpm) for name, (rpm, tpm) in DEFAULT_LIMITS.items()}
+
+
+class LoopSemaphore:
+    """
+    Concurrency cap usable from any event loop: asyncio.Semaphore is bound to
+    one loop, so a separate semaphore (of the same size) is kept per loop.
+    """
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._semaphores = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            sem = self._semaphores.get(loop)
+            if sem is None:
+                sem = self._semaphores[loop] = asyncio.Semaphore(self.limit)
+            return sem
@@ -0,0 +1,92 @@
+import math
+import re
+from typing import List, Tuple
+
+import numpy as np
+
+from core.nlp_engine import LegalNLPEngine
+
+# Passage size for the chat index: roughly one clause or a short group of clauses
+PASSAGE_CHARS = 1200
+TOP_K = 6
+
+# Lower-case Latin words/numbers plus the whole Devanagari block (keeps matras inside Hindi words)
+TOKEN_PATTERN = re.compile(r"[0-9a-z\u0900-\u097F]+")
+STOPWORDS = frozenset("""
+a an and are as at be by for from has have in is it its of on or that the this to was were will with
+what which who whom how does do can i my me we our you your if any all not no
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    return [tok for tok in TOKEN_PATTERN.findall(text.lower()) if tok not in STOPWORDS]
+
+
+class ClauseIndex:
+    """
+    Local BM25 index over a contract's clauses, built once per uploaded document.
+    Postings are NumPy arrays (doc ids + term frequencies), so scoring a
+    question is a handful of vectorized adds instead of resending the whole
+    contract to the LLM.
+    """
+    def __init__(self, passages: List[str], k1: float = 1.5, b: float = 0.75):
+        self.passages = passages
+        self.k1 = k1
+        self.b = b
+
+        postings = {}
+        lengths = np.zeros(len(passages), dtype=np.float32)
+        for doc_id, passage in enumerate(passages):
+            tokens = tokenize(passage)
+            lengths[doc_id] = len(tokens)
+            counts = {}
+            for tok in tokens:
+                counts[tok] = counts.get(tok, 0) + 1
+            for tok, tf in counts.items():
+                postings.setdefault(tok, ([], []))
+                postings[tok][0].append(doc_id)
+                postings[tok][1].append(tf)
+
+        n_docs = max(len(passages), 1)
+        self.doc_len = lengths
+        self.avg_len = float(lengths.mean()) if len(passages) else 0.0
+        self.postings = {}
+        for tok, (ids, tfs) in postings.items():
+            df = len(ids)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            self.postings[tok] = (np.asarray(ids, dtype=np.int32), np.asarray(tfs, dtype=np.float32), idf)
+
+    @classmethod
+    def from_text(cls, text: str, passage_chars: int = PASSAGE_CHARS) -> "ClauseIndex":
+        # Passages are whole clauses packed together, headings ("12.3") included and
+        # short clauses kept, so answers can cite the contract's own numbering
+        return cls(LegalNLPEngine.build_windows(text, passage_chars))
+
+    def search(self, query: str, k: int = TOP_K) -> List[Tuple[int, float]]:
+        """Top-k (passage index, score) pairs with a non-zero score, best first."""
+        if not self.passages:
+            return []
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * self.doc_len / (self.avg_len or 1.0))
+        for tok in set(tokenize(query)):
+            if tok not in self.postings:
+                continue
+            ids, tfs, idf = self.postings[tok]
+            scores[ids] += idf * tfs * (self.k1 + 1) / (tfs + norm[ids])
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [(int(i), float(scores[i])) for i in top if scores[i] > 0]
+
+    def build_context(self, query: str, k: int = TOP_K) -> str:
+        """
+        Relevant excerpts for the chat prompt, in document order so the model
+        reads them as they appear in the contract. Falls back to the opening
+        excerpts when nothing matches (e.g. a Hindi question on an English contract).
+        Passages are ~1,200-char windows, not clauses, so they are labelled as
+        excerpts; the contract's own clause numbers stay inside the text.
+        """
+        hits = self.search(query, k)
+        ids = sorted(i for i, _ in hits) if hits else list(range(min(k, len(self.passages))))
+        return "\n\n".join(f"[Excerpt {i + 1}] {self.passages[i]}" for i in ids)
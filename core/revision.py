@@ -0,0 +1,69 @@
+from typing import Any, Dict, List, Optional
+
+from core.cache import make_key, normalize_text
+from core.nlp_engine import CLAUSE_NUMBER, LegalNLPEngine
+
+# Above this share of new/modified clauses a full audit is cheaper than stitching
+MAX_CHANGED_RATIO = 0.6
+# Leading characters of a quoted clause used to find it in the contract
+QUOTE_PROBE_CHARS = 120
+
+
+def clause_fingerprint(clause: str) -> str:
+    """Content hash of one clause; immune to renumbering, re-wrapping and case changes."""
+    return make_key(normalize_text(CLAUSE_NUMBER.sub("", clause.strip(), count=1)).lower())
+
+
+def _quote_probe(finding: Dict[str, Any]) -> str:
+    # Models often shorten quotes with "..." at the end
+    quote = normalize_text(finding.get("original_text", "")).lower().rstrip(".… ")
+    return quote[:QUOTE_PROBE_CHARS]
+
+
+class ClauseDiff:
+    """
+    Clause-level diff between two versions of a contract, built on
+    LegalNLPEngine.segment_clauses. Tells which clauses of the new version
+    need a fresh audit and which findings of the previous audit still apply.
+    """
+    def __init__(self, previous_text: str, new_text: str):
+        self.previous_clauses = LegalNLPEngine.segment_clauses(previous_text)
+        self.new_clauses = LegalNLPEngine.segment_clauses(new_text)
+        self._previous_fps = [clause_fingerprint(c) for c in self.previous_clauses]
+        new_fps = [clause_fingerprint(c) for c in self.new_clauses]
+        self._new_fp_set = set(new_fps)
+        self._new_body = normalize_text(new_text).lower()
+
+        previous = set(self._previous_fps)
+        self.changed = [c for c, fp in zip(self.new_clauses, new_fps) if fp not in previous]
+        self.removed = sum(1 for fp in self._previous_fps if fp not in self._new_fp_set)
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.changed and not self.removed
+
+    @property
+    def changed_ratio(self) -> float:
+        return len(self.changed) / len(self.new_clauses) if self.new_clauses else 1.0
+
+    def _owner(self, finding: Dict[str, Any]) -> Optional[str]:
+        probe = _quote_probe(finding)
+        if not probe:
+            return None
+        for clause, fp in zip(self.previous_clauses, self._previous_fps):
+            if probe in normalize_text(clause).lower():
+                return fp
+        return None
+
+    def reusable_findings(self, findings: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Previous findings whose clause survives unchanged in the new version."""
+        kept = []
+        for finding in findings:
+            owner = self._owner(finding)
+            if owner is not None:
+                if owner in self._new_fp_set:
+                    kept.append(finding)
+            elif _quote_probe(finding) and _quote_probe(finding) in self._new_body:
+                # Quote not traceable to one clause, but the text is still in the contract
+                kept.append(finding)
+        return kept
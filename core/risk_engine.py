@@ -1,27 +1,243 @@
 import os
 import json
 import time
-import google.generativeai as genai
-from dotenv import load_dotenv
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterator, List, Optional
 
-# Load API Key safely
-load_dotenv()
-genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+from core.cache import DiskCache, make_key, normalize_text
+from core.nlp_engine import LegalNLPEngine
+from core.providers import get_provider_pool
+from core.rate_limit import LoopSemaphore
+from core.json_stream import IncrementalAuditParser, extract_json
+from core.schemas import invalid_fields, validate_audit
+from core.revision import ClauseDiff, MAX_CHANGED_RATIO
+from core.prescreen import PRESCREEN_THRESHOLD, RiskPrescreener
+from core.tracing import span, traced
+from core.prompt_budget import RESERVED_OUTPUT_TOKENS, compact_text, fit_tokens, profile
+
+MODEL_NAME = 'gemini-2.5-flash-lite'
+# Bump whenever the audit prompt changes so stale cached results are not served.
+PROMPT_VERSION = "v4"
+
+# Largest slice of contract text sent in one prompt. Longer contracts are audited in windows.
+MAX_PROMPT_CHARS = 20000
+CHUNK_WORKERS = int(os.getenv("AUDIT_CHUNK_WORKERS", "4"))
+MAX_MERGED_CLAUSES = 8
+# Instructions + JSON skeleton around the contract in the audit prompt
+PROMPT_OVERHEAD_TOKENS = 600
+# Max LLM calls in flight per event loop for analyze_contract_async
+AUDIT_CONCURRENCY = int(os.getenv("AUDIT_CONCURRENCY", "16"))
+_audit_slots = LoopSemaphore(AUDIT_CONCURRENCY)
+_prescreener = RiskPrescreener()
+
+# --- DEMO SETTINGS ---
+# DEMO_MODE=1 makes the app use DemoRiskEngine (offline, instant, deterministic).
+DEMO_MODE = os.getenv("DEMO_MODE", "0") == "1"
+# Artificial "thinking" pauses for demos/recordings. Off by default: they used to
+# dominate p50 latency whenever quota ran out and the fallback path was taken.
+SIMULATED_LATENCY = os.getenv("SIMULATE_LATENCY", "0") == "1"
+
+def simulate_latency(seconds: float) -> None:
+    if SIMULATED_LATENCY:
+        time.sleep(seconds)
+
+# One cache per process, shared by every LegalRiskEngine (each click builds a new engine).
+_analysis_cache = None
+
+def get_analysis_cache() -> DiskCache:
+    global _analysis_cache
+    if _analysis_cache is None:
+        _analysis_cache = DiskCache(
+            "analysis",
+            max_entries=int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "500")),
+            ttl_seconds=float(os.getenv("ANALYSIS_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+        )
+    return _analysis_cache
 
 class LegalRiskEngine:
-    def __init__(self):
-        # Using your working model
-        self.model = genai.GenerativeModel('gemini-2.5-flash-lite')
+    def __init__(self, use_cache: bool = True, strict: bool = False):
+        # Using your working model, on the process-wide client pool (no per-click setup)
+        self.model_name = MODEL_NAME
+        self.providers = get_provider_pool()
+        self.cache = get_analysis_cache() if use_cache else None
+        # strict: raise when no provider answers instead of returning the offline
+        # pre-screen (batch runs must not record it as a real audit)
+        self.strict = strict
+        # Time-to-first-token of the last streamed audit (seconds)
+        self.last_ttft = None
+
+    def cache_key(self, contract_text: str, mode: str = "single") -> str:
+        if mode == "chunked":
+            mode = f"chunked-screen{PRESCREEN_THRESHOLD}"
+        return make_key(normalize_text(contract_text), self.model_name, PROMPT_VERSION, mode)
 
-    def analyze_contract(self, contract_text: str):
+    @traced("audit")
+    def analyze_contract(self, contract_text: str, chunked: Optional[bool] = None):
         """
         Hybrid Analysis:
+        0. Serves repeat audits of the same contract from the result cache.
         1. Tries Real AI (Gemini) with Multilingual Prompt.
-        2. If Quota Exceeded (429) or Error -> Falls back to Mock Data.
+           Contracts longer than one prompt window are audited in chunks
+           (see analyze_contract_chunked) unless `chunked=False`.
+        2. If Quota Exceeded (429) or Error -> Falls back to the offline rule-based pre-screen.
         """
-        
+        if chunked is None:
+            chunked = len(contract_text) > MAX_PROMPT_CHARS
+        mode = "chunked" if chunked else "single"
+
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(contract_text, mode)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            # 1. Try Real AI
+            if chunked:
+                result = self.analyze_contract_chunked(contract_text)
+            else:
+                result = self._analyze_window(contract_text)
+
+        except Exception as e:
+            # 2. Fallback to the offline pre-screen (Safety Net)
+            return self._fallback(contract_text, e)
+
+        # Only complete, real AI answers are cached; offline and partial results must
+        # never be served as a hit (the next call should get another chance at full coverage).
+        if key is not None and not result.get("windows_failed"):
+            self.cache.set(key, result)
+        return result
+
+    def analyze_contract_chunked(self, contract_text: str, max_workers: int = CHUNK_WORKERS,
+                                 window_chars: int = MAX_PROMPT_CHARS) -> Dict[str, Any]:
+        """
+        Map-Reduce audit for long contracts (80-200 page MSAs):
+        0. Screen: clauses the local rule engine scores below PRESCREEN_THRESHOLD
+           (notices, counterparts, definitions...) are not sent to the LLM.
+        1. Map: split into clause-aligned windows and audit them concurrently
+           on a bounded thread pool (latency ~ one call, not one per window).
+        2. Reduce: merge the per-window JSON into a single result.
+        Windows that fail are skipped; raises only if every window fails.
+        The result reports windows_total and windows_failed, so callers can
+        flag (and not cache) partial coverage.
+        """
+        windows = self._screened_windows(contract_text, window_chars)
+        if len(windows) == 1:
+            return dict(self._analyze_window(windows[0]), windows_total=1, windows_failed=0)
+
+        results, last_error = [], None
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(windows)))) as pool:
+            futures = [pool.submit(self._analyze_window, window) for window in windows]
+            for future in futures:
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    print(f"⚠️ Window audit failed ({e}). Continuing with remaining windows.")
+                    last_error = e
+
+        if not results:
+            raise RuntimeError(f"All {len(windows)} windows failed: {last_error}")
+        return dict(self._merge_results(results), windows_total=len(windows), windows_failed=len(windows) - len(results))
+
+    @staticmethod
+    def _screened_windows(contract_text: str, window_chars: int = MAX_PROMPT_CHARS) -> List[str]:
+        """
+        Prompt windows made of the clauses that pass the local pre-screen.
+        Text that doesn't segment into clauses, or where no rule fires at all,
+        goes to the LLM unscreened: the rules only decide what to skip, never
+        that a contract needs no review.
+        """
+        clauses = LegalNLPEngine.segment_clauses(contract_text)
+        flagged = _prescreener.filter_clauses(clauses) if len(clauses) > 1 else []
+        if not flagged:
+            return LegalNLPEngine.build_windows(contract_text, window_chars)
+        if len(flagged) < len(clauses):
+            print(f"🔎 Pre-screen: {len(flagged)} of {len(clauses)} clauses sent for AI review.")
+        return LegalNLPEngine.pack_windows(flagged, window_chars)
+
+    async def analyze_contract_async(self, contract_text: str, chunked: Optional[bool] = None):
+        """
+        Asyncio twin of analyze_contract (same cache, windows, merge and fallback).
+        Every window call holds one of AUDIT_CONCURRENCY slots and waits on the
+        provider's RPM/TPM token buckets, so one server process can keep dozens
+        of audits in flight without tripping 429s.
+        """
+        if chunked is None:
+            chunked = len(contract_text) > MAX_PROMPT_CHARS
+        mode = "chunked" if chunked else "single"
+
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(contract_text, mode)
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+
+        try:
+            windows = self._screened_windows(contract_text) if chunked else [contract_text]
+            outcomes = await asyncio.gather(*(self._analyze_window_async(w) for w in windows), return_exceptions=True)
+            results = [r for r in outcomes if not isinstance(r, BaseException)]
+            errors = [r for r in outcomes if isinstance(r, BaseException)]
+            if not results:
+                raise errors[0]
+            for e in errors:
+                print(f"⚠️ Window audit failed ({e}). Continuing with remaining windows.")
+            result = results[0] if len(windows) == 1 else self._merge_results(results)
+            if chunked:
+                result = dict(result, windows_total=len(windows), windows_failed=len(errors))
+
+        except Exception as e:
+            return self._fallback(contract_text, e)
+
+        if key is not None and not result.get("windows_failed"):
+            self.cache.set(key, result)
+        return result
+
+    def analyze_contract_stream(self, contract_text: str) -> Iterator[Dict[str, Any]]:
+        """
+        Streaming audit for the UI. Yields growing partial results as the
+        model writes its JSON (overall score first, then each clause as soon as
+        it is complete); the LAST item yielded is the full result.
+        Cache hits and long (chunked) contracts yield a single final result.
+        """
+        self.last_ttft = None
+        if len(contract_text) > MAX_PROMPT_CHARS:
+            yield self.analyze_contract(contract_text)
+            return
+
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(contract_text)
+            cached = self.cache.get(key)
+            if cached is not None:
+                yield cached
+                return
+
+        parser = IncrementalAuditParser()
+        start = time.perf_counter()
+        try:
+            self._require_provider()
+            for chunk in self.providers.stream(self.model_name, self._build_prompt(contract_text)):
+                if self.last_ttft is None:
+                    self.last_ttft = time.perf_counter() - start
+                if parser.feed(chunk):
+                    yield parser.snapshot()
+            result = self._parse_result(parser.buffer, contract_text)
+
+        except Exception as e:
+            yield self._fallback(contract_text, e)
+            return
+
+        if key is not None:
+            self.cache.set(key, result)
+        yield result
+
+    @traced("audit.prompt")
+    def _build_prompt(self, contract_text: str) -> str:
         # --- THE POLYGLOT PROMPT UPGRADE ---
-        prompt = f"""
+        return f"""
         You are a Senior Corporate Lawyer in India. 
         INPUT CONTEXT: The user has uploaded a contract. It might be in English or Hindi (Devanagari script).
         
@@ -51,28 +267,172 @@ class LegalRiskEngine:
         }}
 
         CONTRACT TEXT:
-        {contract_text[:20000]}
+        {self._contract_for_prompt(contract_text)}
         """
 
-        try:
-            # 1. Try Real AI
-            response = self.model.generate_content(prompt)
-            clean_json = response.text.replace("```json", "").replace("```", "").strip()
-            return json.loads(clean_json)
+    def _contract_for_prompt(self, contract_text: str) -> str:
+        """
+        Contract text without page furniture, whitespace runs or repeated
+        boilerplate, trimmed only if it would overflow the model's context window
+        (instead of a fixed character cut).
+        """
+        budget = profile(self.model_name).context_tokens - RESERVED_OUTPUT_TOKENS - PROMPT_OVERHEAD_TOKENS
+        return fit_tokens(compact_text(contract_text), budget)
 
-        except Exception as e:
-            # 2. Fallback to Mock Data (Safety Net)
-            print(f"⚠️ Limit Hit or Error ({e}). Switching to Demo Mode.")
-            return self._mock_data()
+    def _fallback(self, contract_text: str, error: Exception) -> Dict[str, Any]:
+        """Offline pre-screen result for a failed audit (never cached); re-raises in strict mode."""
+        if self.strict:
+            raise error
+        print(f"⚠️ Limit Hit or Error ({error}). Switching to offline pre-screen.")
+        return _prescreener.audit(contract_text)
+
+    def _require_provider(self):
+        # Without a key the SDK probes for cloud credentials for seconds before
+        # failing; go straight to the fallback instead.
+        if not self.providers.is_available(self.model_name):
+            raise RuntimeError(f"No API key configured for {self.model_name}")
+
+    def reaudit_contract(self, contract_text: str, previous_text: str,
+                         previous_result: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Incremental audit of a revised version (v2, v3... during negotiation).
+        Clauses are fingerprinted and diffed against the previous version; only
+        added or modified clauses go to the LLM, findings on unchanged clauses
+        are carried over. Falls back to a full audit when the versions can't be
+        segmented or most of the contract changed, and when the previous result
+        was itself partial (its missing windows can't be carried over).
+        The result carries a "revision" entry with the diff statistics; a
+        partial delta audit is reported through windows_total / windows_failed,
+        like analyze_contract_chunked.
+        """
+        diff = ClauseDiff(previous_text, contract_text)
+        stats = {"clauses_total": len(diff.new_clauses), "clauses_reaudited": len(diff.changed),
+                 "clauses_removed": diff.removed}
+        if (not diff.new_clauses or not diff.previous_clauses or diff.changed_ratio > MAX_CHANGED_RATIO
+                or previous_result.get("windows_failed")):
+            result = dict(self.analyze_contract(contract_text))
+            result["revision"] = dict(stats, clauses_reaudited=len(diff.new_clauses), findings_reused=0)
+            return result
+        if diff.unchanged:
+            return dict(previous_result, revision=dict(stats, findings_reused=len(previous_result["clauses"])))
+
+        reused = diff.reusable_findings(previous_result["clauses"])
+        # The old overall score may have come from a clause that is gone now
+        if len(reused) == len(previous_result["clauses"]):
+            carried_score = previous_result["overall_score"]
+        else:
+            carried_score = max((c["risk_score"] for c in reused), default=0)
+        carried = dict(previous_result, clauses=reused, overall_score=carried_score)
+
+        # Modified boilerplate doesn't need the LLM either
+        to_review = _prescreener.filter_clauses(diff.changed)
+        if to_review:
+            try:
+                delta = self.analyze_contract_chunked("\n".join(to_review))
+            except Exception as e:
+                print(f"⚠️ Incremental audit failed ({e}). Re-auditing the full contract.")
+                return self.analyze_contract(contract_text)
+            result = self._merge_results([carried, delta])
+            coverage = {"windows_total": delta["windows_total"], "windows_failed": delta["windows_failed"]}
+        else:
+            result = self._merge_results([carried])
+            coverage = {"windows_total": 0, "windows_failed": 0}
+        result.update(coverage)
+        result["revision"] = dict(stats, findings_reused=len(reused), **coverage)
+        return result
+
+    def _build_repair_prompt(self, partial: Dict[str, Any], fields: List[str], contract_text: str) -> str:
+        return f"""
+        You are a Senior Corporate Lawyer in India. You audited the contract below and
+        produced this JSON, but the fields {", ".join(fields)} are missing or invalid:
+        {json.dumps(partial, ensure_ascii=False)}
+
+        Return strictly Valid JSON containing ONLY the keys {", ".join(fields)}, in the
+        same format as above (scores are integers 0-100, risk_level is High, Medium or Low;
+        each clause has original_text, risk_score, explanation_english, explanation_hindi
+        and recommendation). Do not add markdown.
+
+        CONTRACT TEXT:
+        {self._contract_for_prompt(contract_text)}
+        """
+
+    def _parse_result(self, text: str, contract_text: str) -> Dict[str, Any]:
+        """
+        Model answer -> validated audit dict. If only some fields are missing or
+        malformed, asks for just those fields instead of re-running the audit.
+        """
+        with span("audit.parse_json") as sp:
+            sp.set(response_chars=len(text))
+            data = extract_json(text)
+            fields = invalid_fields(data)
+        if fields:
+            print(f"⚠️ Repairing audit fields: {', '.join(fields)}")
+            patch = extract_json(self.providers.generate(self.model_name, self._build_repair_prompt(data, fields, contract_text)))
+            data.update({k: patch[k] for k in fields if k in patch})
+        return validate_audit(data)
+
+    async def _parse_result_async(self, text: str, contract_text: str) -> Dict[str, Any]:
+        with span("audit.parse_json") as sp:
+            sp.set(response_chars=len(text))
+            data = extract_json(text)
+            fields = invalid_fields(data)
+        if fields:
+            print(f"⚠️ Repairing audit fields: {', '.join(fields)}")
+            async with _audit_slots.get():
+                repair = await self.providers.generate_async(self.model_name, self._build_repair_prompt(data, fields, contract_text))
+            patch = extract_json(repair)
+            data.update({k: patch[k] for k in fields if k in patch})
+        return validate_audit(data)
+
+    def _analyze_window(self, contract_text: str) -> Dict[str, Any]:
+        self._require_provider()
+        text = self.providers.generate(self.model_name, self._build_prompt(contract_text))
+        return self._parse_result(text, contract_text)
+
+    async def _analyze_window_async(self, contract_text: str) -> Dict[str, Any]:
+        self._require_provider()
+        async with _audit_slots.get():
+            text = await self.providers.generate_async(self.model_name, self._build_prompt(contract_text))
+        return await self._parse_result_async(text, contract_text)
+
+    @staticmethod
+    def _merge_results(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Reduce step. A contract is as risky as its riskiest section, so the
+        overall score comes from the worst window. Clauses quoted by more than
+        one window (overlapping boilerplate, repeated definitions) are
+        de-duplicated on their normalized text, keeping the highest score.
+        """
+        unique = {}
+        for result in results:
+            for clause in result["clauses"]:
+                fingerprint = normalize_text(clause["original_text"]).lower()[:200]
+                previous = unique.get(fingerprint)
+                if previous is None or clause["risk_score"] > previous["risk_score"]:
+                    unique[fingerprint] = clause
+
+        clauses = sorted(unique.values(), key=lambda c: c["risk_score"], reverse=True)
+        worst = max(results, key=lambda r: r["overall_score"])
+
+        return {
+            "overall_score": worst["overall_score"],
+            "risk_level": worst["risk_level"],
+            "detected_language": results[0]["detected_language"],
+            "summary_english": " ".join(r["summary_english"] for r in results if r["summary_english"]),
+            "summary_hindi": " ".join(r["summary_hindi"] for r in results if r["summary_hindi"]),
+            "clauses": clauses[:MAX_MERGED_CLAUSES],
+            "windows_audited": len(results)
+        }
 
     def _mock_data(self):
         """
         Safe Demo Data with Hindi translations pre-filled.
         """
-        time.sleep(2)
+        simulate_latency(2)
         return {
             "overall_score": 88,
             "risk_level": "High",
+            "detected_language": "English",
             "summary_english": "DEMO MODE: This Agreement contains critical risks regarding liability caps and unilateral termination. It appears heavily weighted in favor of the Client.",
             "summary_hindi": "डेमो मोड: इस अनुबंध में दायित्व सीमा और एकतरफा समाप्ति के संबंध में गंभीर जोखिम हैं। यह ग्राहक के पक्ष में भारी प्रतीत होता है।",
             "clauses": [
@@ -91,4 +451,30 @@ class LegalRiskEngine:
                     "recommendation": "Require a mutual 'Notice Period' of at least 30 days for termination."
                 }
             ]
-        }
\ No newline at end of file
+        }
+
+
+class DemoRiskEngine(LegalRiskEngine):
+    """
+    Offline stand-in for LegalRiskEngine: no API keys, no network, no cache.
+    Always returns the demo result instantly (unless SIMULATE_LATENCY=1),
+    so it can back the UI in DEMO_MODE as well as benchmarks and tests.
+    """
+    def __init__(self):
+        self.model_name = "demo"
+        self.cache = None
+        self.strict = False
+        self.last_ttft = None
+
+    def analyze_contract(self, contract_text: str, chunked: Optional[bool] = None):
+        return self._mock_data()
+
+    async def analyze_contract_async(self, contract_text: str, chunked: Optional[bool] = None):
+        return self._mock_data()
+
+    def analyze_contract_stream(self, contract_text: str) -> Iterator[Dict[str, Any]]:
+        yield self._mock_data()
+
+    def reaudit_contract(self, contract_text: str, previous_text: str,
+                         previous_result: Dict[str, Any]) -> Dict[str, Any]:
+        return self._mock_data()
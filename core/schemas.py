@@ -0,0 +1,64 @@
+from typing import Any, Dict, List, Optional
+
+from pydantic import BaseModel, ValidationError, field_validator
+
+RISK_LEVELS = ("High", "Medium", "Low")
+
+
+def _score(value: Any) -> Any:
+    # Models write 85, "85", 85.0 or "85/100"; anything numeric is clamped to 0-100
+    if isinstance(value, str):
+        value = value.split("/")[0].strip()
+    try:
+        return max(0, min(100, round(float(value))))
+    except (TypeError, ValueError):
+        return value  # Let pydantic report it as invalid
+
+
+class ClauseFinding(BaseModel):
+    original_text: str
+    risk_score: int
+    explanation_english: str
+    explanation_hindi: str = ""
+    recommendation: str = ""
+
+    _clamp_score = field_validator("risk_score", mode="before")(_score)
+
+
+class AuditResult(BaseModel):
+    """Shape of one contract audit, as returned by LegalRiskEngine and cached."""
+    overall_score: int
+    risk_level: str
+    detected_language: str = "English"
+    summary_english: str
+    summary_hindi: str = ""
+    clauses: List[ClauseFinding] = []
+    windows_audited: Optional[int] = None
+    windows_total: Optional[int] = None
+    windows_failed: Optional[int] = None
+
+    _clamp_score = field_validator("overall_score", mode="before")(_score)
+
+    @field_validator("risk_level", mode="before")
+    @classmethod
+    def _normalize_level(cls, value: Any) -> Any:
+        # "HIGH", "high risk", "High/Medium/Low" -> first level mentioned
+        if isinstance(value, str):
+            for level in RISK_LEVELS:
+                if level.lower() in value.lower():
+                    return level
+        return value
+
+
+def invalid_fields(data: Dict[str, Any]) -> List[str]:
+    """Top-level audit fields that are missing or fail validation (empty if valid)."""
+    try:
+        AuditResult.model_validate(data)
+        return []
+    except ValidationError as e:
+        return sorted({str(err["loc"][0]) for err in e.errors() if err["loc"]})
+
+
+def validate_audit(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Validated, normalized audit dict. Raises pydantic.ValidationError."""
+    return AuditResult.model_validate(data).model_dump(exclude_none=True)
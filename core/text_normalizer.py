@@ -0,0 +1,75 @@
+import re
+from typing import Dict, Optional
+
+# Any run of whitespace (newlines included) becomes one space
+WHITESPACE = re.compile(r'\s+')
+# Layout-preserving variant. Only runs that actually change are matched (a single
+# space between words is left alone), which keeps the match count low on big files.
+INLINE_SPACE = re.compile(r'[^\S\n]{2,}|[^\S \n]')
+LINE_BREAKS = re.compile(r'\n\s*')
+
+# Script ranges, matched as runs so a word costs one match instead of one per character
+SCRIPTS = {
+    "devanagari": re.compile(r'[ऀ-ॿ]+'),
+}
+
+# Personal identifiers common in Indian contracts, in ONE alternation.
+# Every branch is anchored to a token start by the shared (?<!\w), so the engine
+# only tries the branches there (not at every character). That is a plain word
+# boundary, so "Tel.9876543210" or "Mobile-9876543210" are caught; EMAIL adds its
+# own lookbehind so it can't start mid-address. The lookahead keeps the numeric
+# branches away from alphabetic tokens. A bare 12-digit number is only an Aadhaar
+# when written 4-4-4 or labelled as one ("Rs. 234567890123" is an amount).
+PII_PATTERN = re.compile(
+    r'(?<!\w)(?:'
+    r'(?=[\d+])(?:'
+    r'(?P<GSTIN>\d{2}[A-Z]{5}\d{4}[A-Z][1-9A-Z]Z[0-9A-Z]\b)'
+    r'|(?P<AADHAAR>[2-9]\d{3}(?P<aadhaar_sep>[ -])\d{4}(?P=aadhaar_sep)\d{4}\b)'
+    r'|(?P<PHONE>(?:\+91[\s-]?)?\d{10}\b))'
+    r'|(?P<PAN>[A-Z]{5}\d{4}[A-Z]\b)'
+    r'|(?P<AADHAAR_LABELLED>(?P<aadhaar_label>(?:(?i:aadhaa?r|uid)\b|आधार)[^\d\n]{0,20})[2-9]\d{3}[ -]?\d{4}[ -]?\d{4}\b)'
+    r'|(?<![.%+-])(?P<EMAIL>[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}\b)'
+    r')'
+)
+
+
+
+def normalize_whitespace(text: str) -> str:
+    """Collapses every whitespace run to one space (Hindi characters untouched)."""
+    return WHITESPACE.sub(' ', text).strip()
+
+
+def normalize_layout(text: str) -> str:
+    """
+    Like normalize_whitespace, but every whitespace run containing a line break
+    becomes one newline, so clause numbering at the start of a line ("12.",
+    "ARTICLE IV") is still there for LegalNLPEngine.segment_clauses.
+    """
+    return LINE_BREAKS.sub('\n', INLINE_SPACE.sub(' ', text)).replace(' \n', '\n').strip()
+
+
+def count_script(text: str, script: str = "devanagari", limit: Optional[int] = None) -> int:
+    """
+    Number of characters of `script` in text. With `limit`, stops as soon as the
+    count exceeds it, so "is this Hindi?" costs a few matches, not a full scan.
+    """
+    count = 0
+    for match in SCRIPTS[script].finditer(text):
+        count += match.end() - match.start()
+        if limit is not None and count > limit:
+            break
+    return count
+
+
+def redact_pii(text: str, counts: Optional[Dict[str, int]] = None) -> str:
+    """Replaces emails, phone numbers, PAN, Aadhaar and GSTIN with [REDACTED_<KIND>]."""
+    def replace(match):
+        kind = match.lastgroup
+        label = ""
+        if kind == "AADHAAR_LABELLED":
+            # Keep "Aadhaar No." and redact only the number
+            kind, label = "AADHAAR", match.group("aadhaar_label")
+        if counts is not None:
+            counts[kind] = counts.get(kind, 0) + 1
+        return f"{label}[REDACTED_{kind}]"
+    return PII_PATTERN.sub(replace, text)
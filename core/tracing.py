@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import atexit
+import bisect
+import threading
+from functools import wraps
+from typing import Any, Dict, List, Tuple
+
+# --- TRACING SETTINGS ---
+TRACING_ENABLED = os.getenv("LEGALEAGLE_TRACING", "0") == "1"
+# Written at interpreter exit when set: *.prom -> Prometheus text, anything else -> JSON
+TRACE_FILE = os.getenv("LEGALEAGLE_TRACE_FILE")
+
+# Upper bounds: seconds for stage durations, units (tokens/bytes/chars) for sizes
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+SIZE_BUCKETS = tuple(4 ** i * 64 for i in range(10))  # 64 .. ~16M
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus semantics: cumulative on export)."""
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.bounds, value)] += 1
+            self.count += 1
+            self.sum += value
+
+    def quantile(self, q: float) -> float:
+        """Upper bound of the bucket holding the q-th observation (inf if it overflowed)."""
+        with self._lock:
+            if not self.count:
+                return 0.0
+            rank, seen = q * self.count, 0
+            for bound, n in zip(self.bounds + (float("inf"),), self.counts):
+                seen += n
+                if seen >= rank:
+                    return bound
+            return float("inf")
+
+
+class Registry:
+    """Histograms keyed by (metric, stage); shared by every span in the process."""
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.errors: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, metric: str, stage: str) -> Histogram:
+        key = (metric, stage)
+        hist = self._histograms.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self._histograms.setdefault(key, Histogram(TIME_BUCKETS if metric == "seconds" else SIZE_BUCKETS))
+        return hist
+
+    def record_error(self, stage: str) -> None:
+        with self._lock:
+            self.errors[stage] = self.errors.get(stage, 0) + 1
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per stage: calls, errors, latency percentiles and mean sizes."""
+        rows = {}
+        for (metric, stage), hist in sorted(self._histograms.items()):
+            row = rows.setdefault(stage, {"stage": stage, "calls": 0, "errors": self.errors.get(stage, 0)})
+            if metric == "seconds":
+                row.update(calls=hist.count, total_s=round(hist.sum, 3),
+                           p50_s=hist.quantile(0.5), p95_s=hist.quantile(0.95))
+            elif hist.count:
+                row[f"avg_{metric}"] = round(hist.sum / hist.count)
+        return sorted(rows.values(), key=lambda row: row["stage"])
+
+    def prometheus_text(self) -> str:
+        lines = []
+        for metric in sorted({m for m, _ in self._histograms}):
+            name = f"legaleagle_stage_{metric}"
+            lines.append(f"# TYPE {name} histogram")
+            for (m, stage), hist in sorted(self._histograms.items()):
+                if m != metric:
+                    continue
+                cumulative = 0
+                for bound, n in zip(hist.bounds + (float("inf"),), hist.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{name}_bucket{{stage="{stage}",le="{le}"}} {cumulative}')
+                lines.append(f'{name}_sum{{stage="{stage}"}} {hist.sum}')
+                lines.append(f'{name}_count{{stage="{stage}"}} {hist.count}')
+        lines.append("# TYPE legaleagle_stage_errors_total counter")
+        for stage, n in sorted(self.errors.items()):
+            lines.append(f'legaleagle_stage_errors_total{{stage="{stage}"}} {n}')
+        return "\n".join(lines) + "\n"
+
+    def export(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            if path.endswith(".prom"):
+                f.write(self.prometheus_text())
+            else:
+                json.dump(self.summary(), f, indent=2)
+
+
+registry = Registry()
+
+
+class Span:
+    """Times one stage; numeric attributes set on it (tokens, bytes...) become size histograms."""
+    __slots__ = ("stage", "measures", "_start")
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self.measures: Dict[str, float] = {}
+
+    def set(self, **measures: float) -> None:
+        self.measures.update(measures)
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        registry.histogram("seconds", self.stage).observe(time.perf_counter() - self._start)
+        for metric, value in self.measures.items():
+            registry.histogram(metric, self.stage).observe(value)
+        if exc_type is not None:
+            registry.record_error(self.stage)
+        return False
+
+
+class _NoopSpan:
+    """Returned when tracing is off: no clock reads, no allocation, no locking."""
+    __slots__ = ()
+
+    def set(self, **measures: float) -> None:
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP = _NoopSpan()
+
+
+def span(stage: str):
+    """
+    Usage:
+        with span("audit.llm") as sp:
+            ...
+            sp.set(prompt_tokens=1200, response_bytes=len(text))
+    """
+    return Span(stage) if TRACING_ENABLED else _NOOP
+
+
+def traced(stage: str):
+    """Decorator form of span() for whole functions."""
+    def decorator(fn):
+        if not TRACING_ENABLED:
+            return fn
+
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            with Span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+if TRACING_ENABLED and TRACE_FILE:
+    atexit.register(registry.export, TRACE_FILE)
@@ -0,0 +1,98 @@
+import os
+import json
+from typing import Any, Callable, Dict
+
+from core.cache import DiskCache, hash_json, make_key
+from core.json_stream import extract_json
+from core.tracing import traced
+
+# Bump whenever the translation prompt changes so stale translations are not served.
+TRANSLATION_PROMPT_VERSION = "v1"
+
+_translation_cache = None
+
+def get_translation_cache() -> DiskCache:
+    global _translation_cache
+    if _translation_cache is None:
+        _translation_cache = DiskCache(
+            "translations",
+            max_entries=int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "2000")),
+            ttl_seconds=float(os.getenv("TRANSLATION_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+        )
+    return _translation_cache
+
+_fallback_cache = None
+
+def get_fallback_cache() -> DiskCache:
+    """Short-lived record of failed translations: reruns show English instead of calling the LLM again."""
+    global _fallback_cache
+    if _fallback_cache is None:
+        _fallback_cache = DiskCache(
+            "translation_fallbacks",
+            max_entries=int(os.getenv("TRANSLATION_CACHE_MAX_ENTRIES", "2000")),
+            ttl_seconds=float(os.getenv("TRANSLATION_FALLBACK_TTL_SECONDS", "600"))
+        )
+    return _fallback_cache
+
+
+def english_view(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """The texts shown in the Audit tab, untranslated."""
+    return {
+        "summary": analysis["summary_english"],
+        "clauses": [
+            {
+                "explanation": clause["explanation_english"],
+                "recommendation": clause["recommendation"]
+            }
+            for clause in analysis["clauses"]
+        ]
+    }
+
+
+@traced("translate")
+def translate_analysis(analysis: Dict[str, Any], language: str,
+                       generate_fn: Callable[[str], str]) -> Dict[str, Any]:
+    """
+    Translates the summary and every clause explanation/recommendation in ONE
+    structured LLM request, cached per (analysis hash, language) so Streamlit
+    reruns and repeat views never pay for it again.
+    Returns the same shape as english_view(); falls back to English if the
+    model's answer can't be used. A fallback is only remembered for
+    TRANSLATION_FALLBACK_TTL_SECONDS, so reruns in the meantime don't repeat
+    the call, and a later view tries the translation again.
+    """
+    source = english_view(analysis)
+    if language == "English":
+        return source
+
+    cache = get_translation_cache()
+    key = make_key(hash_json(analysis), language, TRANSLATION_PROMPT_VERSION)
+    cached = cache.get(key)
+    if cached is not None:
+        return cached
+    fallbacks = get_fallback_cache()
+    if fallbacks.get(key):
+        return source
+
+    prompt = f"""
+    Translate every string value in this JSON to {language}. Keep the legal meaning precise.
+    Keep the exact same keys, structure and number of clauses.
+    Return strictly Valid JSON only. Do not add markdown.
+
+    {json.dumps(source, ensure_ascii=False)}
+    """
+    try:
+        raw = generate_fn(prompt)
+        translated = extract_json(raw)
+        clauses = translated.get("clauses", [])
+        if (not isinstance(translated.get("summary"), str)
+                or len(clauses) != len(source["clauses"])
+                or not all(isinstance(c.get("explanation"), str) and isinstance(c.get("recommendation"), str) for c in clauses)):
+            raise ValueError("Translation does not match the source structure")
+    except Exception as e:
+        print(f"⚠️ Translation failed ({e}). Showing English.")
+        fallbacks.set(key, True)
+        return source
+
+    cache.set(key, translated)
+    return translated
@@ -1,57 +1,25 @@
 import streamlit as st
-import time
-import os
+from functools import partial
 import plotly.graph_objects as go
-import re
 from dotenv import load_dotenv
 
-# --- AI LIBRARIES ---
-import google.generativeai as genai
-
-# Safe Imports for Backups
-try:
-    from openai import OpenAI
-except ImportError:
-    OpenAI = None
-
-try:
-    from groq import Groq
-except ImportError:
-    Groq = None
-
 # Import Custom Modules
-from core.document_parser import DocumentParser
-from core.nlp_engine import LegalNLPEngine
-from core.risk_engine import LegalRiskEngine
-from utils.helpers import generate_pdf_report, generate_contract_pdf
+from core.artifacts import parse_upload, get_artifact_cache
+from core.nlp_engine import LegalNLPEngine, pipeline_stats
+from core.risk_engine import LegalRiskEngine, DemoRiskEngine, DEMO_MODE, get_analysis_cache, simulate_latency
+from core.llm_router import generate_smart_fallback, stream_smart_fallback, router_status
+from core.translation import translate_analysis, english_view
+from core.retrieval import ClauseIndex
+from core.text_normalizer import redact_pii
+from core.prompt_budget import PROMPT_TOKEN_BUDGET, build_prompt, fit_tokens
+from core.tracing import TRACING_ENABLED, registry
+from utils.helpers import cached_pdf_report, cached_contract_pdf
 
 # Load Environment
 load_dotenv()
 
-# --- 1. CONFIGURE CLIENTS ---
-# Google Setup
-try:
-    if os.getenv("GEMINI_API_KEY"):
-        genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
-except:
-    pass
-
-# OpenAI Setup (Auto-fix for your "OPEN_API_KEY" typo)
-openai_client = None
-key_openai = os.getenv("OPENAI_API_KEY") or os.getenv("OPEN_API_KEY")
-if OpenAI and key_openai:
-    try:
-        openai_client = OpenAI(api_key=key_openai)
-    except:
-        pass
-
-# Groq Setup
-groq_client = None
-if Groq and os.getenv("GROQ_API_KEY"):
-    try:
-        groq_client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-    except:
-        pass
+# --- 1 & 3. AI CLIENTS + MODEL PRIORITY LIST ---
+# Configured in core/llm_router.py (shared with scripts and benchmarks).
 
 # --- 2. PAGE CONFIG ---
 st.set_page_config(
@@ -61,61 +29,16 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# --- 3. ULTIMATE MODEL PRIORITY LIST ---
-# STRICTLY using the models found in your list + Backups.
-MODEL_PRIORITY = [
-    "gemini-2.5-flash-lite",      # 1. Google: Fastest & High Quota
-    "gemini-2.5-flash",           # 2. Google: Best Quality
-    "gpt-4o-mini",                # 3. OpenAI: Reliable Backup
-    "llama3-70b-8192",            # 4. Groq: Super Fast Backup
-    "gemini-2.0-flash-lite",      # 5. Google: Stable Previous Gen
-    "gemini-pro-latest",          # 6. Google: Valid Legacy Model (Found in your list)
-    "gemini-flash-latest",        # 7. Google: Valid Flash Model (Found in your list)
-    "gpt-4o",                     # 8. OpenAI: Heavy Duty
-    "mixtral-8x7b-32768"          # 9. Groq: Context Backup
-]
-
-def generate_smart_fallback(prompt):
-    """
-    Tries Google -> OpenAI -> Groq. 
-    Never crashes, just moves to the next model.
-    """
-    last_error = None
-    
-    for model_name in MODEL_PRIORITY:
-        try:
-            # --- GOOGLE GEMINI ---
-            if "gemini" in model_name:
-                if not os.getenv("GEMINI_API_KEY"): continue
-                model = genai.GenerativeModel(model_name)
-                response = model.generate_content(prompt)
-                return response.text
-
-            # --- OPENAI GPT ---
-            elif "gpt" in model_name:
-                if not openai_client: continue
-                response = openai_client.chat.completions.create(
-                    model=model_name,
-                    messages=[{"role": "user", "content": prompt}],
-                    temperature=0.7
-                )
-                return response.choices[0].message.content
-
-            # --- GROQ ---
-            elif "llama" in model_name or "mixtral" in model_name:
-                if not groq_client: continue
-                chat_completion = groq_client.chat.completions.create(
-                    messages=[{"role": "user", "content": prompt}],
-                    model=model_name,
-                )
-                return chat_completion.choices[0].message.content
+# --- 2b. PRE-WARM NLP ---
+# Runs once per server process, not once per session or rerun.
+@st.cache_resource
+def prewarm_nlp():
+    try:
+        LegalNLPEngine.prewarm()
+    except Exception as e:
+        print(f"⚠️ spaCy pre-warm failed ({e}). It will load on first use.")
 
-        except Exception as e:
-            # Silently fail and try the next model
-            last_error = e
-            continue 
-    
-    return f"⚠️ System Busy: All AI channels (Google, OpenAI, Groq) are overloaded. Please check your API Keys in Secrets. (Error: {str(last_error)})"
+prewarm_nlp()
 
 # --- 4. TRANSLATION DICTIONARY ---
 TRANSLATIONS = {
@@ -263,7 +186,7 @@ def show_landing_page():
         
         if st.button("🚀 Launch Dashboard", type="primary"):
             with st.spinner("Initializing Secure Environment..."):
-                time.sleep(1.2)
+                simulate_latency(1.2)
                 st.session_state.page = 'app'
                 st.rerun()
         st.markdown("<br><small>🔒 Enterprise-Grade Security • AES-256 Encryption</small>", unsafe_allow_html=True)
@@ -308,10 +231,10 @@ def create_gauge_chart(score):
     fig.update_layout(height=250, margin={'t': 40, 'b': 0, 'l': 20, 'r': 20}, paper_bgcolor="rgba(0,0,0,0)", plot_bgcolor="rgba(0,0,0,0)")
     return fig
 
+@st.cache_data(show_spinner=False)
 def anonymize_text(text):
-    text = re.sub(r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b', "[REDACTED_EMAIL]", text)
-    text = re.sub(r'\b\d{10}\b', "[REDACTED_PHONE]", text)
-    return text
+    # Emails, phones, PAN, Aadhaar and GSTIN in one compiled pass; cached across reruns
+    return redact_pii(text)
 
 # --- APP UI ---
 st.markdown("""
@@ -346,7 +269,28 @@ with st.sidebar:
     
     st.markdown("---")
     with st.container():
-        st.markdown("""<div style="background-color: #F8FAFC; padding: 10px; border-radius: 8px; border: 1px solid #E2E8F0;"><small style="color: #64748B;">System Status</small><br><span style="color: #22C55E; font-weight: bold;">● Online</span></div>""", unsafe_allow_html=True)
+        model_status = router_status()
+        configured = [m for m in model_status if m["configured"]]
+        healthy = [m for m in configured if m["state"] != "open"]
+        if not configured:
+            status_label, status_color = "● Offline (no API keys)", "#EF4444"
+        elif not healthy:
+            status_label, status_color = "● All models cooling down", "#EF4444"
+        elif len(healthy) < len(configured):
+            status_label, status_color = f"● Degraded ({len(healthy)}/{len(configured)} models)", "#F59E0B"
+        else:
+            status_label, status_color = "● Online", "#22C55E"
+        st.markdown(f"""<div style="background-color: #F8FAFC; padding: 10px; border-radius: 8px; border: 1px solid #E2E8F0;"><small style="color: #64748B;">System Status</small><br><span style="color: {status_color}; font-weight: bold;">{status_label}</span></div>""", unsafe_allow_html=True)
+        with st.expander("🩺 Model Health"):
+            st.dataframe(configured, hide_index=True, use_container_width=True)
+        with st.expander("⚡ Audit Cache"):
+            st.json(get_analysis_cache().stats())
+            st.json(get_artifact_cache().stats())
+        with st.expander("🧠 NLP Pipeline"):
+            st.json(pipeline_stats())
+        if TRACING_ENABLED:
+            with st.expander("⏱️ Stage Timings"):
+                st.dataframe(registry.summary(), hide_index=True, use_container_width=True)
     st.sidebar.markdown("---")
     st.sidebar.caption("👨‍💻 Developed by **SACHIN S** for HCL GUVI Hackathon")
     if st.button("⬅️ Log Out"):
@@ -360,27 +304,36 @@ tab1, tab2, tab3 = st.tabs([t("nav_audit"), t("nav_chat"), t("nav_draft")])
 with tab1:
     if 'doc_text' not in st.session_state:
         st.markdown(f"""<div style="text-align: center; padding: 50px; border: 2px dashed #CBD5E1; border-radius: 12px; background-color: #F8FAFC;"><h3 style="color: #475569;">{t("upload_label")}</h3><p style="color: #94A3B8;">{t("upload_sub")}</p></div>""", unsafe_allow_html=True)
-        uploaded_file = st.file_uploader("Upload Agreement", type=['pdf', 'docx'], label_visibility="collapsed")
+        uploaded_file = st.file_uploader("Upload Agreement", type=['pdf', 'docx', 'doc'], label_visibility="collapsed")
         
         if uploaded_file:
             with st.spinner("Extracting text..."):
-                raw_text, error = DocumentParser.parse_file(uploaded_file)
+                raw_text, error = parse_upload(uploaded_file)
                 if error:
                     st.error(error)
                     st.stop()
                 st.session_state['doc_text'] = raw_text
                 st.session_state['last_filename'] = uploaded_file.name
                 st.session_state.pop('analysis_result', None) 
+                st.session_state.pop('doc_index', None)
+                st.session_state.pop('previous_version', None)
                 st.rerun()
     else:
         with st.expander(t("change_doc")):
-             new_file = st.file_uploader("Upload New Agreement", type=['pdf', 'docx'])
+             new_file = st.file_uploader("Upload New Agreement", type=['pdf', 'docx', 'doc'])
              if new_file:
-                 raw_text, error = DocumentParser.parse_file(new_file)
+                 raw_text, error = parse_upload(new_file)
                  if not error:
+                     # Keep the audited version so the new one only re-audits what changed
+                     if 'analysis_result' in st.session_state and 'audited_text' in st.session_state:
+                         st.session_state['previous_version'] = {
+                             'text': st.session_state['audited_text'],
+                             'result': st.session_state['analysis_result']
+                         }
                      st.session_state['doc_text'] = raw_text
                      st.session_state['last_filename'] = new_file.name
                      st.session_state.pop('analysis_result', None)
+                     st.session_state.pop('doc_index', None)
                      st.rerun()
 
         text_to_analyze = st.session_state['doc_text']
@@ -391,19 +344,35 @@ with tab1:
             col1, col2, col3 = st.columns([1,2,1])
             with col2:
                 if st.button(t("run_audit"), type="primary", use_container_width=True):
-                    risk_engine = LegalRiskEngine()
+                    risk_engine = DemoRiskEngine() if DEMO_MODE else LegalRiskEngine()
+                    previous = st.session_state.get('previous_version')
                     with st.status(t("analyzing"), expanded=True) as status:
-                        time.sleep(1)
-                        result = risk_engine.analyze_contract(text_to_analyze)
+                        simulate_latency(1)
+                        if previous:
+                            # Revised version: only new/modified clauses go to the LLM
+                            result = risk_engine.reaudit_contract(text_to_analyze, previous['text'], previous['result'])
+                            revision = result.get('revision', {})
+                            done = f" ({revision['clauses_reaudited']}/{revision['clauses_total']} clauses re-audited)" if revision else ""
+                        else:
+                            # Score and clauses appear as the model writes them
+                            score_slot, clause_slot = st.empty(), st.empty()
+                            result = None
+                            for result in risk_engine.analyze_contract_stream(text_to_analyze):
+                                if result.get('overall_score') is not None:
+                                    score_slot.markdown(f"**{t('risk_score')}:** {result['overall_score']}/100")
+                                clause_slot.markdown("\n".join(f"- ⚠️ {c.get('explanation_english', '')[:80]}" for c in result.get('clauses', [])))
+                            done = f" (first token {risk_engine.last_ttft:.1f}s)" if risk_engine.last_ttft else ""
                         st.session_state['analysis_result'] = result
-                        status.update(label="Complete!", state="complete", expanded=False)
+                        st.session_state['audited_text'] = text_to_analyze
+                        st.session_state.pop('previous_version', None)
+                        status.update(label=f"Complete!{done}", state="complete", expanded=False)
                     st.rerun()
 
         if 'analysis_result' in st.session_state:
             res = st.session_state['analysis_result']
             m1, m2, m3 = st.columns(3)
-            m1.markdown(f"<div class='metric-container'><div class='metric-label'>{t('risk_score')}</div><div class='metric-value' style='color: {'#EF4444' if res['overall_score'] > 70 else '#22C55E'}'>{res.get('overall_score')}/100</div></div>", unsafe_allow_html=True)
-            m2.markdown(f"<div class='metric-container'><div class='metric-label'>{t('clauses_flagged')}</div><div class='metric-value'>{len(res.get('clauses', []))}</div></div>", unsafe_allow_html=True)
+            m1.markdown(f"<div class='metric-container'><div class='metric-label'>{t('risk_score')}</div><div class='metric-value' style='color: {'#EF4444' if res['overall_score'] > 70 else '#22C55E'}'>{res['overall_score']}/100</div></div>", unsafe_allow_html=True)
+            m2.markdown(f"<div class='metric-container'><div class='metric-label'>{t('clauses_flagged')}</div><div class='metric-value'>{len(res['clauses'])}</div></div>", unsafe_allow_html=True)
             m3.markdown(f"<div class='metric-container'><div class='metric-label'>{t('jurisdiction')}</div><div class='metric-value'>India 🇮🇳</div></div>", unsafe_allow_html=True)
 
             st.markdown("<br>", unsafe_allow_html=True)
@@ -411,49 +380,37 @@ with tab1:
             
             with c_left:
                 st.markdown(f"### {t('risk_score')}")
-                st.plotly_chart(create_gauge_chart(res.get('overall_score')), use_container_width=True)
+                st.plotly_chart(create_gauge_chart(res['overall_score']), use_container_width=True)
                 st.markdown(f"### {t('actions')}")
                 official = st.checkbox("Official Report Mode")
-                report_data = generate_pdf_report(res, is_draft=not official)
-                st.download_button(t("download_report"), data=report_data, file_name="Audit_Report.pdf", mime="application/pdf", use_container_width=True)
+                # Rendered only when clicked, and at most once per (analysis, mode)
+                report_data = partial(cached_pdf_report, res, not official)
+                st.download_button(t("download_report"), data=report_data, file_name="Audit_Report.pdf", mime="application/pdf", on_click="ignore", use_container_width=True)
 
             with c_right:
-                st.markdown(f"### {t('exec_summary')}")
-                summary_text = res.get('summary_english')
+                # One structured request per (analysis, language), cached across reruns
                 if st.session_state.language != "English":
-                    with st.spinner(f"Translating summary to {st.session_state.language}..."):
-                         summary_text = generate_smart_fallback(f"Translate this legal summary to {st.session_state.language}: {summary_text}")
-                st.info(summary_text)
+                    with st.spinner(f"Translating to {st.session_state.language}..."):
+                        view = translate_analysis(res, st.session_state.language, generate_smart_fallback)
+                else:
+                    view = english_view(res)
+
+                st.markdown(f"### {t('exec_summary')}")
+                st.info(view["summary"])
+                if res.get('windows_failed'):
+                    st.warning(f"⚠️ Partial audit: {res['windows_failed']} of {res['windows_total']} sections could not be reviewed by the AI. Run the audit again for full coverage.")
                 
                 st.markdown(f"### {t('crit_risks')}")
-                if not res.get('clauses'):
+                if not res['clauses']:
                     st.success("No high-risk clauses detected.")
                 
-                for clause in res.get('clauses', []):
-                    explanation = clause.get('explanation_english')
-                    recommendation = clause.get('recommendation')
-                    
-                    if st.session_state.language != "English":
-                        combined_prompt = f"""
-                        Translate these two legal texts to {st.session_state.language}.
-                        1. {explanation}
-                        2. {recommendation}
-                        Format the output as:
-                        Trans1: [translation of 1]
-                        Trans2: [translation of 2]
-                        """
-                        try:
-                            trans_res = generate_smart_fallback(combined_prompt)
-                            if "Trans1:" in trans_res and "Trans2:" in trans_res:
-                                parts = trans_res.split("Trans2:")
-                                explanation = parts[0].replace("Trans1:", "").strip()
-                                recommendation = parts[1].strip()
-                        except:
-                            pass 
+                for clause, translated in zip(res['clauses'], view["clauses"]):
+                    explanation = translated["explanation"]
+                    recommendation = translated["recommendation"]
 
                     with st.expander(f"⚠️ {explanation[:60]}..."):
                         st.markdown(f"**{t('lbl_analysis')}:** {explanation}")
-                        st.markdown(f"**{t('lbl_original')}:**\n> *{clause.get('original_text')}*")
+                        st.markdown(f"**{t('lbl_original')}:**\n> *{clause['original_text']}*")
                         st.markdown(f"**{t('lbl_rec')}:** {recommendation}")
 
 # --- TAB 2: CHAT ---
@@ -469,10 +426,22 @@ with tab2:
         if prompt := st.chat_input(t("chat_placeholder")):
             st.session_state.messages.append({"role": "user", "content": prompt})
             with chat_container: st.markdown(f"<div style='overflow: hidden;'><div class='chat-user'>{prompt}</div></div>", unsafe_allow_html=True)
-            with st.spinner("Thinking..."):
-                context = st.session_state['doc_text'][:30000]
-                ai_prompt = f"Context: {context}\n\nQuestion: {prompt}\n\nAnswer based ONLY on the context. Answer in {st.session_state.language} language."
-                ans = generate_smart_fallback(ai_prompt)
+            # Only the clauses relevant to this question, from anywhere in the contract
+            if 'doc_index' not in st.session_state:
+                st.session_state['doc_index'] = ClauseIndex.from_text(st.session_state['doc_text'])
+            context = st.session_state['doc_index'].build_context(prompt)
+            # Token-budgeted: small enough for the fast models, so the router can pick them
+            ai_prompt = build_prompt(
+                "Context: {context}\n\nQuestion: {question}\n\nAnswer based ONLY on the context. Answer in {language} language.",
+                context=context, question=fit_tokens(prompt, PROMPT_TOKEN_BUDGET // 4), language=st.session_state.language
+            )
+            with chat_container:
+                answer_slot = st.empty()
+                answer_slot.markdown("<div style='overflow: hidden;'><div class='chat-ai'>Thinking...</div></div>", unsafe_allow_html=True)
+                ans = ""
+                for piece in stream_smart_fallback(ai_prompt):
+                    ans += piece
+                    answer_slot.markdown(f"<div style='overflow: hidden;'><div class='chat-ai'>{ans}</div></div>", unsafe_allow_html=True)
             st.session_state.messages.append({"role": "assistant", "content": ans})
             st.rerun()
     else:
@@ -495,12 +464,18 @@ with tab3:
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button(t("gen_draft"), type="primary"):
         if p1 and p2:
-            with st.spinner("Drafting..."):
-                d_prompt = f"Draft a professional {doc_type} between {p1} and {p2} for {loc}, India. Draft in {st.session_state.language} language. Use professional legal terminology."
-                res_text = generate_smart_fallback(d_prompt)
-                clean_draft = res_text.replace("**", "")
+            d_prompt = f"Draft a professional {doc_type} between {p1} and {p2} for {loc}, India. Draft in {st.session_state.language} language. Use professional legal terminology."
+            # Show the draft as it is written, then swap in the editable text area
+            draft_slot = st.empty()
+            draft_slot.info("Drafting...")
+            res_text = ""
+            for piece in stream_smart_fallback(d_prompt):
+                res_text += piece
+                draft_slot.markdown(res_text)
+            clean_draft = res_text.replace("**", "")
+            with draft_slot.container():
                 st.text_area("Generated Draft", clean_draft, height=500)
-                pdf_bytes = generate_contract_pdf(clean_draft)
-                st.download_button(t("download_contract"), data=pdf_bytes, file_name="Draft.pdf", mime="application/pdf")
+                pdf_bytes = partial(cached_contract_pdf, clean_draft)
+                st.download_button(t("download_contract"), data=pdf_bytes, file_name="Draft.pdf", mime="application/pdf", on_click="ignore")
         else:
             st.error("⚠️ Please enter details.")
\ No newline at end of file
@@ -0,0 +1,58 @@
+import time
+
+from core.llm_router import LLMRouter
+
+
+def make_router(streams, **kwargs):
+    def stream_fn(model_name, prompt):
+        return streams[model_name]()
+    return LLMRouter(models=list(streams), stream_fn=stream_fn,
+                     available_fn=lambda m: True, **kwargs)
+
+
+def stalled():
+    time.sleep(1.0)
+    yield "slow answer"
+
+
+def fast():
+    yield "fast "
+    yield "answer"
+
+
+def test_stream_hedges_a_stalled_first_token():
+    router = make_router({"gpt-4o-mini": stalled, "gpt-4o": fast}, hedge_delay=0.1, max_in_flight=2)
+    start = time.perf_counter()
+    chunks = router.stream("question")
+    assert next(chunks) == "fast "
+    assert time.perf_counter() - start < 0.5
+    assert "".join(chunks) == "answer"
+
+
+def test_stream_replaces_a_failed_attempt_immediately():
+    def broken():
+        raise RuntimeError("quota")
+        yield
+
+    router = make_router({"gpt-4o-mini": broken, "gpt-4o": fast}, hedge_delay=5.0, max_in_flight=2)
+    start = time.perf_counter()
+    assert "".join(router.stream("question")) == "fast answer"
+    assert time.perf_counter() - start < 1.0
+
+
+def test_stream_reports_busy_when_every_model_fails():
+    def empty():
+        yield ""
+
+    router = make_router({"gpt-4o-mini": empty}, hedge_delay=0.1, max_in_flight=2)
+    assert "System Busy" in "".join(router.stream("question"))
+
+
+def test_stream_interruption_keeps_the_partial_answer():
+    def flaky():
+        yield "partial"
+        raise RuntimeError("reset")
+
+    router = make_router({"gpt-4o-mini": flaky}, hedge_delay=0)
+    answer = "".join(router.stream("question"))
+    assert answer.startswith("partial") and "interrupted (reset)" in answer
@@ -0,0 +1,35 @@
+from core.risk_engine import LegalRiskEngine
+
+CLAUSES = [f"{i}. This Agreement may be executed in counterparts, each of which is an original copy number {i}."
+           for i in range(1, 10)]
+PREVIOUS = "\n".join(CLAUSES + ["10. The Vendor's liability shall be capped at the fees paid."])
+REVISED = "\n".join(CLAUSES + ["10. The Vendor shall have unlimited liability for all losses."])
+
+FINDING = {"clause_type": "Liability", "original_text": CLAUSES[0], "risk_score": 3,
+           "risk_level": "Low", "explanation": "", "suggestion": ""}
+
+
+def audit(clauses, **coverage):
+    return dict({"overall_score": 3, "risk_level": "Low", "detected_language": "English",
+                 "summary_english": "", "summary_hindi": "", "clauses": clauses}, **coverage)
+
+
+def make_engine(delta):
+    engine = LegalRiskEngine(use_cache=False)
+    engine.analyze_contract_chunked = lambda text: delta
+    engine.analyze_contract = lambda text: audit([], windows_total=1, windows_failed=0, full=True)
+    return engine
+
+
+def test_partial_delta_is_reported_as_partial():
+    delta = audit([], windows_total=2, windows_failed=1)
+    result = make_engine(delta).reaudit_contract(REVISED, PREVIOUS, audit([FINDING], windows_total=1, windows_failed=0))
+    assert "full" not in result
+    assert result["windows_failed"] == 1 and result["windows_total"] == 2
+    assert result["revision"]["windows_failed"] == 1
+
+
+def test_partial_previous_result_is_not_reused():
+    delta = audit([], windows_total=1, windows_failed=0)
+    result = make_engine(delta).reaudit_contract(REVISED, PREVIOUS, audit([FINDING], windows_total=2, windows_failed=1))
+    assert result["full"] and result["revision"]["findings_reused"] == 0
@@ -0,0 +1,22 @@
+from core.retrieval import ClauseIndex
+
+CONTRACT = "\n".join(
+    ["MASTER AGREEMENT between Acme Technologies Pvt Ltd and Beta Solutions LLP."]
+    + [f"{i}. The Service Provider shall indemnify and hold harmless the Client against any and all "
+       f"losses, claims and damages arising out of this Agreement." for i in range(1, 12)]
+    + ["12. Payment.", "12.3 Invoices are payable within 45 days of receipt by the Client."]
+    + [f"{i}. This Agreement may be executed in counterparts, each of which shall be deemed an original."
+       for i in range(13, 40)]
+    + ["40. Governing law: India."]
+)
+
+
+def test_context_keeps_clause_numbers():
+    context = ClauseIndex.from_text(CONTRACT).build_context("When are invoices payable?")
+    assert "12.3 Invoices are payable within 45 days" in context
+    assert context.startswith("[Excerpt ")
+
+
+def test_context_finds_short_clause():
+    context = ClauseIndex.from_text(CONTRACT).build_context("Which governing law applies?")
+    assert "40. Governing law: India." in context
@@ -0,0 +1,31 @@
+from core.nlp_engine import LegalNLPEngine
+from core.risk_engine import LegalRiskEngine
+
+CONTRACT = "\n".join(
+    ["MASTER AGREEMENT between Acme Technologies Pvt Ltd and Beta Solutions LLP."]
+    + [f"{i}. All notices under this Agreement shall be in writing and delivered by courier or email."
+       for i in range(1, 80)]
+    + ["80. Vendor liability is unlimited.", "81. Client may terminate at any time."]
+    + [f"{i}. This Agreement may be executed in counterparts, each of which shall be deemed an original."
+       for i in range(82, 500)]
+)
+
+
+def test_segments_keep_headings_and_short_clauses():
+    clauses = LegalNLPEngine.segment_clauses(CONTRACT)
+    assert "80. Vendor liability is unlimited." in clauses
+    assert "12.3 Notices go by courier." in LegalNLPEngine.segment_clauses("12. Notices.\n12.3 Notices go by courier.")
+    assert len(clauses) == 500
+
+
+def test_chunked_windows_include_short_risky_clauses():
+    windows = LegalRiskEngine._screened_windows(CONTRACT, window_chars=4000)
+    for clause in ("80. Vendor liability is unlimited.", "81. Client may terminate at any time."):
+        assert any(clause in window for window in windows)
+
+
+def test_windows_lose_no_clause():
+    windows = LegalNLPEngine.build_windows(CONTRACT, max_chars=4000)
+    assert len(windows) > 1
+    assert all(len(w) <= 4000 for w in windows)
+    assert "\n".join(windows) == CONTRACT
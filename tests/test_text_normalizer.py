@@ -0,0 +1,35 @@
+import pytest
+
+from core.text_normalizer import normalize_layout, redact_pii
+
+
+@pytest.mark.parametrize("text", ["Tel.9876543210", "Mobile-9876543210", "Mob. No.9876543210", "call +91 9876543210"])
+def test_phone_after_punctuation_is_redacted(text):
+    assert "9876543210" not in redact_pii(text)
+    assert "[REDACTED_PHONE]" in redact_pii(text)
+
+
+@pytest.mark.parametrize("text", ["Aadhaar 2345 6789 0123", "UID: 2345-6789-0123", "Aadhaar No. 234567890123",
+                                  "signatory 2345 6789 0123", "आधार संख्या 234567890123"])
+def test_aadhaar_grouped_or_labelled_is_redacted(text):
+    counts = {}
+    redacted = redact_pii(text, counts)
+    assert counts == {"AADHAAR": 1}
+    assert not any(ch.isdigit() for ch in redacted)
+
+
+@pytest.mark.parametrize("text", ["Rs. 234567890123", "invoice total 234567890123 paid"])
+def test_twelve_digit_amount_is_not_aadhaar(text):
+    assert redact_pii(text) == text
+
+
+def test_other_identifiers():
+    counts = {}
+    redacted = redact_pii("PAN ABCDE1234F, GSTIN 27ABCDE1234F1Z5, mail legal@acme-india.com", counts)
+    assert counts == {"PAN": 1, "GSTIN": 1, "EMAIL": 1}
+    assert "acme-india" not in redacted
+
+
+def test_normalize_layout_keeps_one_break_per_line_run():
+    assert normalize_layout(" a \t b \r\n\n  2. c  \n") == "a b\n2. c"
+    assert normalize_layout("a  \n \n\tb") == "a\nb"
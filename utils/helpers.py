@@ -1,5 +1,16 @@
 from fpdf import FPDF
 import datetime
+import os
+import threading
+from collections import OrderedDict
+
+from core.cache import hash_json, make_key
+from core.tracing import traced
+
+# Rendered PDFs kept in memory (least recently used are evicted first)
+PDF_CACHE_MAX_ENTRIES = int(os.getenv("PDF_CACHE_MAX_ENTRIES", "32"))
+_pdf_cache = OrderedDict()
+_pdf_cache_lock = threading.Lock()
 
 def clean_text(text):
     """
@@ -14,6 +25,7 @@ def clean_text(text):
     # Force encode to ascii compatible latin-1, ignoring errors
     return text.encode('latin-1', 'ignore').decode('latin-1')
 
+@traced("pdf.report")
 def generate_pdf_report(analysis_json, is_draft=True):
     """
     Generates the Risk Audit Report (Tab 1).
@@ -39,7 +51,7 @@ def generate_pdf_report(analysis_json, is_draft=True):
     pdf.set_font("Arial", size=10)
     pdf.cell(0, 10, clean_text(f"Date Generated: {datetime.date.today()}"), ln=True)
     pdf.cell(0, 10, clean_text(f"Status: {'DRAFT - NOT FOR LEGAL USE' if is_draft else 'OFFICIAL REPORT'}"), ln=True)
-    score = analysis_json.get('overall_score', 0)
+    score = analysis_json['overall_score']
     pdf.cell(0, 10, clean_text(f"Risk Score: {score}/100"), ln=True)
     pdf.ln(5)
     
@@ -49,7 +61,7 @@ def generate_pdf_report(analysis_json, is_draft=True):
     pdf.cell(0, 10, clean_text("Executive Summary:"), ln=True, fill=True)
     
     pdf.set_font("Arial", size=11)
-    summary_text = analysis_json.get('summary_english', analysis_json.get('summary', 'No summary available.'))
+    summary_text = analysis_json['summary_english'] or 'No summary available.'
     pdf.multi_cell(0, 8, clean_text(summary_text))
     pdf.ln(10)
     
@@ -61,29 +73,30 @@ def generate_pdf_report(analysis_json, is_draft=True):
     pdf.set_font("Arial", size=10)
     
     # FIX IS HERE: Changed 'analysis' to 'analysis_json'
-    for clause in analysis_json.get('clauses', []):
-        risk_score = clause.get('risk_score', 0)
+    for clause in analysis_json['clauses']:
+        risk_score = clause['risk_score']
         if risk_score > 75:
             pdf.set_text_color(200, 0, 0)
         else:
             pdf.set_text_color(200, 120, 0)
             
         pdf.set_font("Arial", 'B', 10)
-        explanation = clause.get('explanation_english', clause.get('explanation', ''))
+        explanation = clause['explanation_english']
         pdf.cell(0, 8, clean_text(f"FLAG: {explanation[:60]}... (Score: {risk_score})"), ln=True)
         pdf.set_text_color(0, 0, 0)
         
         pdf.set_font("Arial", 'I', 9)
-        pdf.multi_cell(0, 5, clean_text(f"Original: {clause.get('original_text', '')}"))
+        pdf.multi_cell(0, 5, clean_text(f"Original: {clause['original_text']}"))
         
         pdf.set_font("Arial", 'B', 9)
-        rec = clause.get('recommendation', 'No specific recommendation.')
+        rec = clause['recommendation'] or 'No specific recommendation.'
         pdf.multi_cell(0, 5, clean_text(f"Advice: {rec}"))
         pdf.ln(5)
         
     return pdf.output(dest='S').encode('latin-1', 'ignore')
 
 # --- FUNCTION FOR TAB 3 ---
+@traced("pdf.contract")
 def generate_contract_pdf(contract_text):
     """
     Generates a clean Contract PDF (Tab 3).
@@ -119,4 +132,31 @@ def generate_contract_pdf(contract_text):
         else:
             pdf.multi_cell(0, 6, clean_text(clean_line))
             
-    return pdf.output(dest='S').encode('latin-1', 'ignore')
\ No newline at end of file
+    return pdf.output(dest='S').encode('latin-1', 'ignore')
+
+def _memoized_pdf(key, render):
+    with _pdf_cache_lock:
+        if key in _pdf_cache:
+            _pdf_cache.move_to_end(key)
+            return _pdf_cache[key]
+    data = render()
+    with _pdf_cache_lock:
+        _pdf_cache[key] = data
+        while len(_pdf_cache) > PDF_CACHE_MAX_ENTRIES:
+            _pdf_cache.popitem(last=False)
+    return data
+
+def cached_pdf_report(analysis_json, is_draft=True):
+    """
+    generate_pdf_report, memoized on (analysis hash, draft flag, date).
+    Pass it (with functools.partial) as the download button's data so the PDF
+    is only built when the user actually clicks Download.
+    The report is always rendered in English (the core PDF fonts are Latin-1
+    only), so the UI language is deliberately not part of the key.
+    """
+    key = make_key("report", hash_json(analysis_json), is_draft, datetime.date.today())
+    return _memoized_pdf(key, lambda: generate_pdf_report(analysis_json, is_draft=is_draft))
+
+def cached_contract_pdf(contract_text):
+    """generate_contract_pdf, memoized on the draft text."""
+    return _memoized_pdf(make_key("contract", contract_text), lambda: generate_contract_pdf(contract_text))